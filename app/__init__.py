@@ -1,6 +1,8 @@
 from .exchanges import NBP as ExchangeNBP
+from .exchanges import Cached as CachedExchange
 from .providers import Revolut, Degiro, Binance
 
 from .account import Account
 from .transaction_provider import TransactionProvider
 from .transfer import Crypto
+from .report import report as print_report, report_years
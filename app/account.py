@@ -1,58 +1,68 @@
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass
 from decimal import Decimal
 from datetime import datetime
 
 from .equity import StockEquity, RealizedChange
 from .dividend import Dividend
 from .exchange import Exchange, Currency
+from .ledger import Ledger, epoch_day
+from .lots import Lots
+from .money import TAX_RATE
+from .realized import RealizedChanges, year_period
 from .transaction import Transaction, Activity
 
 
 class AccountPosition:
     symbol: str
-    _current_positions: List[StockEquity]
+    _current_positions: Lots
     _exchange: Exchange
-    realized_changes: List[RealizedChange]
+    realized_changes: RealizedChanges
     _dividends: List[Dividend]
 
     def __init__(self, symbol: str, exchange: Exchange):
         self.symbol = symbol
-        self._current_positions = []
+        self._current_positions = Lots()
         self._exchange = exchange
-        self.realized_changes = []
+        self.realized_changes = RealizedChanges()
         self._dividends = []
 
     def buy(self, quantity: Decimal, price: Decimal, date: datetime, currency: Currency):
-        self._current_positions.append(StockEquity(quantity, quantity, price, date, currency))
+        self._current_positions.append(
+            StockEquity(quantity, quantity, price, date, currency, self._current_positions.factor)
+        )
 
     def _sell_i(self, sell_quantity: Decimal, sell_price: Decimal, sell_date: datetime) -> RealizedChange:
         if len(self._current_positions) == 0:
             raise Exception(f"symbol={self.symbol}: you can't sell stock that you don't own")
 
-        quantity_sold = min(self._current_positions[0].quantity, sell_quantity)
-        buy_price = self._current_positions[0].price * self._exchange.ratio(
-            self._current_positions[0].date, self._current_positions[0].currency, Currency.PLN
-        )
-        sell_price_ratio = sell_price * self._exchange.ratio(
-            sell_date, self._current_positions[0].currency, Currency.PLN
-        )
+        lot = self._current_positions.first()
+        lot_price = self._current_positions.price_of(lot)
+        quantity_sold = min(self._current_positions.quantity_of(lot), sell_quantity)
+        ratio_buy = self._exchange.ratio(lot.date, lot.currency, Currency.PLN)
+        ratio_sell = self._exchange.ratio(sell_date, lot.currency, Currency.PLN)
+        buy_price = lot_price * ratio_buy
+        sell_price_ratio = sell_price * ratio_sell
         change = (sell_price_ratio - buy_price) * quantity_sold
 
         rc = RealizedChange(
-            self._current_positions[0].date,
+            lot.date,
             sell_date,
             quantity_sold,
-            self._current_positions[0].price,
+            lot_price,
             sell_price,
             change,
-            self._current_positions[0].currency,
+            lot.currency,
+            ratio_buy,
+            ratio_sell,
+            buy_price * quantity_sold,
+            sell_price_ratio * quantity_sold,
         )
         self.realized_changes.append(rc)
 
-        self._current_positions[0].quantity -= quantity_sold
-        # If we sold all quantity from the earliest position, remove it.
-        if round(self._current_positions[0].quantity, 15) == 0:
-            self._current_positions.pop(0)
+        self._current_positions.consume(quantity_sold)
 
         return rc
 
@@ -65,12 +75,12 @@ class AccountPosition:
         return realized_changes
 
     def stock_split(self, ratio: Decimal):
-        for i, _ in enumerate(self._current_positions):
-            self._current_positions[i].quantity = self._current_positions[i].quantity * ratio
-            self._current_positions[i].price = self._current_positions[i].price / ratio
+        self._current_positions.split(ratio)
 
-    def dividend(self, value: Decimal, tax_deducted: Decimal, date: datetime, currency: Currency):
-        self._dividends.append(Dividend(value, tax_deducted, date, currency))
+    def dividend(self, value: Decimal, tax_deducted: Decimal, date: datetime, currency: Currency) -> Dividend:
+        dividend = Dividend(value, tax_deducted, date, currency)
+        self._dividends.append(dividend)
+        return dividend
 
     def dividends_received(self, year: Optional[int]) -> Tuple[Decimal, Decimal, Decimal]:
         total = Decimal(0)
@@ -88,21 +98,50 @@ class AccountPosition:
         return total, tax_to_pay, net
 
 
+# Result of applying a single transaction to its position: realized changes of a sell or a dividend.
+_Outcome = Union[List[RealizedChange], Dividend, None]
+
+
+@dataclass
+class RealizedSummary:
+    """Realized changes of a single symbol in a single year (in PLN)."""
+
+    profit: Decimal = Decimal(0)
+    cost: Decimal = Decimal(0)
+    proceeds: Decimal = Decimal(0)
+
+
+@dataclass
+class DividendSummary:
+    """Dividends of a single symbol in a single year (in PLN)."""
+
+    total: Decimal = Decimal(0)
+    tax_to_pay: Decimal = Decimal(0)
+    net: Decimal = Decimal(0)
+
+
 class Account:
     _positions: Dict[str, AccountPosition]
-    _realized_change: Dict[str, List[RealizedChange]]
+    # Realized changes of all symbols, indexed by the date of selling.
+    _realized: RealizedChanges
     _dividends: Dict[str, Decimal]
     _exchange: Exchange
 
+    # Running aggregates keyed by (year, symbol), updated as transactions are processed.
+    _realized_summary: Dict[Tuple[int, str], RealizedSummary]
+    _dividend_summary: Dict[Tuple[int, str], DividendSummary]
+
     _transactions_per_month: Dict[str, int]
 
     def __init__(self, exchange):
         self._positions = {}
-        self._realized_change = {}
+        self._realized = RealizedChanges()
         self._dividends = {}
         self._exchange = exchange
         self._cost = Decimal(0)
         self._transactions_per_month = {}
+        self._realized_summary = {}
+        self._dividend_summary = {}
 
     def _get_position(self, symbol: str) -> AccountPosition:
         try:
@@ -115,55 +154,166 @@ class Account:
 
     def _add_change(self, symbol: str, changes: List[RealizedChange]):
         for change in changes:
-            try:
-                self._realized_change[symbol].append(change)
-            except KeyError:
-                self._realized_change[symbol] = [change]
-
-    def _evaluate_stock_split_ratio(self, transaction: Transaction) -> Decimal:
-        position = self._get_position(transaction.symbol)
-        current_quantity = sum([p.quantity for p in position._current_positions])
+            self._realized.append(change)
+
+            key = (change.date_sell.year, symbol)
+            summary = self._realized_summary.get(key)
+            if summary is None:
+                summary = self._realized_summary[key] = RealizedSummary()
+            summary.profit += change.profit
+            summary.cost += change.cost
+            summary.proceeds += change.proceeds
+
+    def _add_dividend(self, symbol: str, dividend: Dividend):
+        key = (dividend.date.year, symbol)
+        summary = self._dividend_summary.get(key)
+        if summary is None:
+            summary = self._dividend_summary[key] = DividendSummary()
+        ratio = self._exchange.ratio(dividend.date, dividend.currency, Currency.PLN)
+        summary.total += dividend.value * ratio
+        summary.tax_to_pay += dividend.tax_to_pay() * ratio
+        summary.net += dividend.net() * ratio
+
+    @staticmethod
+    def _evaluate_stock_split_ratio(position: AccountPosition, transaction: Transaction) -> Decimal:
+        current_quantity = position._current_positions.quantity
         ratio = (current_quantity + transaction.quantity) / current_quantity
         return Decimal(ratio)
 
-    def do_transaction(self, transaction: Transaction):
-        position = self._get_position(transaction.symbol)
+    @classmethod
+    def _apply(cls, position: AccountPosition, transaction: Transaction) -> _Outcome:
+        """Applies the transaction to the position and returns its realized changes (sell) or dividend."""
         if transaction.activity == Activity.BUY:
             position.buy(transaction.quantity, transaction.price, transaction.settle_date, transaction.currency)
         elif transaction.activity == Activity.SELL:
-            realized_changes = position.sell(transaction.quantity, transaction.price, transaction.settle_date)
-            self._add_change(transaction.symbol, realized_changes)
+            return position.sell(transaction.quantity, transaction.price, transaction.settle_date)
         elif transaction.activity == Activity.SSP:
-            ratio = self._evaluate_stock_split_ratio(transaction)
+            ratio = cls._evaluate_stock_split_ratio(position, transaction)
             position.stock_split(ratio)
         elif transaction.activity == Activity.DIV:
-            position.dividend(
+            return position.dividend(
                 transaction.amount, transaction.dividend_tax_deducted, transaction.settle_date, transaction.currency
             )
+        return None
+
+    def _record(self, symbol: str, outcome: _Outcome):
+        if isinstance(outcome, Dividend):
+            self._add_dividend(symbol, outcome)
+        elif outcome is not None:
+            self._add_change(symbol, outcome)
+
+    def do_transaction(self, transaction: Transaction):
+        position = self._get_position(transaction.symbol)
+        self._record(transaction.symbol, self._apply(position, transaction))
         self._save_position(position)
 
     def do_transactions(self, transactions: List[Transaction], year: int):
         transactions.sort(key=lambda x: x.trade_date)
+        self.do_sorted_transactions(transactions, year)
+
+    def do_sorted_transactions(self, transactions: Iterable[Transaction], year: int):
+        """Processes transactions (already in trade date order) up to the end of the year, e.g. from a stream."""
         for transaction in transactions:
             if transaction.trade_date.year > year:
                 break
             self.do_transaction(transaction)
 
+    def do_sorted_transactions_by_year(
+        self, transactions: Iterable[Transaction], first_year: int, last_year: int
+    ) -> Iterator[int]:
+        """
+        Processes transactions (already in trade date order) up to the end of last_year in a single pass.
+        Every year of the range is yielded as soon as the transactions up to its end are processed,
+        i.e. when the account is in the same state as after do_sorted_transactions(transactions, year).
+        """
+        year = first_year
+        for transaction in transactions:
+            while transaction.trade_date.year > year:
+                yield year
+                year += 1
+                if year > last_year:
+                    return
+            self.do_transaction(transaction)
+        yield from range(year, last_year + 1)
+
+    def do_transactions_parallel(self, transactions: Iterable[Transaction], year: int, processes: int = 2):
+        """
+        Gives the same results as do_sorted_transactions, but positions of different symbols are realized
+        in a pool of processes (FIFO matching of one symbol does not depend on the others).
+        Transactions are partitioned by symbol; realized changes and dividends are then recorded
+        in the order of the transactions, exactly as if they were processed one by one.
+        """
+        partitions: Dict[str, List[Transaction]] = {}
+        ordered: List[Transaction] = []
+        for transaction in transactions:
+            if transaction.trade_date.year > year:
+                break
+            partitions.setdefault(transaction.symbol, []).append(transaction)
+            ordered.append(transaction)
+
+        symbols = list(partitions)
+        positions = [self._positions.get(symbol) or AccountPosition(symbol, self._exchange) for symbol in symbols]
+        work = [partitions[symbol] for symbol in symbols]
+        if processes <= 1 or len(symbols) <= 1:
+            results = [_realize_partition(position, partition) for position, partition in zip(positions, work)]
+        else:
+            chunksize = max(1, len(symbols) // (processes * 4))
+            # The exchange is sent to every worker once, not with each of the positions.
+            positions = [_without_exchange(position) for position in positions]
+            with ProcessPoolExecutor(processes, initializer=_init_partition_worker, initargs=(self._exchange,)) as pool:
+                results = list(pool.map(_realize_partition, positions, work, chunksize=chunksize))
+
+        realized: Dict[str, AccountPosition] = {}
+        outcomes: Dict[str, Iterator[_Outcome]] = {}
+        for symbol, (position, symbol_outcomes) in zip(symbols, results):
+            position._exchange = self._exchange
+            realized[symbol] = position
+            outcomes[symbol] = iter(symbol_outcomes)
+
+        for transaction in ordered:
+            self._record(transaction.symbol, next(outcomes[transaction.symbol]))
+            self._save_position(realized[transaction.symbol])
+
+    def do_ledger(self, ledger: Ledger, year: int):
+        ledger.sort()
+        end = epoch_day(year + 1)
+        for i in range(len(ledger)):
+            if ledger.trade_day[i] >= end:
+                break
+            self.do_transaction(ledger.transaction(i))
+
     def get_profit_per_symbol(self, year: Optional[int] = None) -> Dict[str, Decimal]:
         profits: Dict[str, Decimal] = {}
-        for symbol, changes in self._realized_change.items():
-            for change in changes:
-                if year and change.date_sell.year != year:
-                    continue
-                try:
-                    profits[symbol] += change.profit
-                except KeyError:
-                    profits[symbol] = change.profit
+        for (summary_year, symbol), summary in self._realized_summary.items():
+            if year and summary_year != year:
+                continue
+            try:
+                profits[symbol] += summary.profit
+            except KeyError:
+                profits[symbol] = summary.profit
         return profits
 
+    def realized_changes(self, start: datetime, end: datetime, symbol: str = "") -> List[RealizedChange]:
+        """Returns the changes (of all symbols, unless the symbol is given) sold in [start, end)."""
+        if symbol != "":
+            return self.position(symbol).realized_changes.between(start, end)
+        return self._realized.between(start, end)
+
+    def get_realized_summary(self, start: datetime, end: datetime, symbol: str = "") -> RealizedSummary:
+        """
+        Sums up the changes sold in [start, end), e.g. of a month or a quarter (see app.realized).
+        Summaries of whole years are kept up to date, see get_profit.
+        """
+        summary = RealizedSummary()
+        for change in self.realized_changes(start, end, symbol):
+            summary.profit += change.profit
+            summary.cost += change.cost
+            summary.proceeds += change.proceeds
+        return summary
+
     def get_tax(self, year: int) -> Decimal:
         profit = self.get_profit(year)
-        tax = profit * Decimal(0.19)
+        tax = profit * TAX_RATE
         tax = round(tax, 2)
         if tax < 0:
             return Decimal(0)
@@ -171,11 +321,10 @@ class Account:
 
     def get_profit(self, year: Optional[int] = None) -> Decimal:
         profit = Decimal(0)
-        for _, rcs in self._realized_change.items():
-            for rc in rcs:
-                if year and rc.date_sell.year != year:
-                    continue
-                profit += rc.profit
+        for (summary_year, _), summary in self._realized_summary.items():
+            if year and summary_year != year:
+                continue
+            profit += summary.profit
         return profit
 
     def position(self, symbol: str) -> AccountPosition:
@@ -185,18 +334,19 @@ class Account:
         total = Decimal(0)
         tax_to_pay = Decimal(0)
         net = Decimal(0)
-        for _, position in self._positions.items():
-            a, b, c = position.dividends_received(year)
-            total += a
-            tax_to_pay += b
-            net += c
+        for (summary_year, _), summary in self._dividend_summary.items():
+            if year and summary_year != year:
+                continue
+            total += summary.total
+            tax_to_pay += summary.tax_to_pay
+            net += summary.net
         return total, tax_to_pay, net
 
     def print_current_positions(self):
         for _, position in self._positions.items():
             if len(position._current_positions) == 0:
                 continue
-            quantity = sum([p.quantity for p in position._current_positions])
+            quantity = position._current_positions.quantity
             print(f"{position.symbol}: {round(quantity, 2)}")
 
     def print_stocks(self, year: int, show_summary_per_stock: bool = False):
@@ -222,17 +372,16 @@ class Account:
         print("\n=== Dividends\n")
         print(f"Total      = {round(dividend_total, 4)} PLN")
         print(f"Net        = {round(dividend_net, 4)} PLN")
-        print(f"Tax        = {round(float(dividend_total)*.19, 4)} PLN")
-        print(f"Tax (paid) = {round(float(dividend_total)*.19 - float(dividend_tax), 4)} PLN")
+        print(f"Tax        = {round(dividend_total * TAX_RATE, 4)} PLN")
+        print(f"Tax (paid) = {round(dividend_total * TAX_RATE - dividend_tax, 4)} PLN")
 
     def get_profits(self, year: Optional[int] = None):
         a, b = Decimal(0), Decimal(0)
-        for symbol, position in self._positions.items():
-            for c in position.realized_changes:
-                if year and c.date_sell.year != year:
-                    continue
-                a += c.price_buy * c.quantity * self._exchange.ratio(c.date_buy, c.currency, Currency.PLN)
-                b += c.price_sell * c.quantity * self._exchange.ratio(c.date_sell, c.currency, Currency.PLN)
+        for (summary_year, _), summary in self._realized_summary.items():
+            if year and summary_year != year:
+                continue
+            a += summary.cost
+            b += summary.proceeds
         return a, b
 
     def print_stocks_transactions(self, symbol: str = "", year: Optional[int] = None):
@@ -242,14 +391,39 @@ class Account:
             symbols = [s for s, _ in self._positions.items()]
         print("\nTransactions:")
         for symbol in symbols:
-            for c in self.position(symbol).realized_changes:
-                if year and c.date_sell.year != year:
-                    continue
+            changes = self.position(symbol).realized_changes
+            for c in changes.between(*year_period(year)) if year else changes:
                 print(
                     f"{symbol}: {c.date_buy.date()} - {c.date_sell.date()}: {c.price_buy} USD -> {c.price_sell} USD (*{round(c.quantity, 8)})"
                     f" = {round(c.profit, 2)} PLN"
                 )
-                print(f"{c.date_buy.date()}: 1 PLN = {self._exchange.ratio(c.date_buy, c.currency, Currency.PLN)} USD")
-                print(
-                    f"{c.date_sell.date()}: 1 PLN = {self._exchange.ratio(c.date_sell, c.currency, Currency.PLN)} USD"
-                )
+                print(f"{c.date_buy.date()}: 1 PLN = {c.ratio_buy} USD")
+                print(f"{c.date_sell.date()}: 1 PLN = {c.ratio_sell} USD")
+
+
+# Exchange of a worker process realizing partitions of transactions (see Account.do_transactions_parallel).
+_worker_exchange: Optional[Exchange] = None
+
+
+def _init_partition_worker(exchange: Exchange):
+    global _worker_exchange
+    _worker_exchange = exchange
+
+
+def _realize_partition(
+    position: AccountPosition, transactions: List[Transaction]
+) -> Tuple[AccountPosition, List[_Outcome]]:
+    """Applies the transactions of a single symbol to its position, returns the position and the outcomes."""
+    if _worker_exchange is None:
+        return position, [Account._apply(position, transaction) for transaction in transactions]
+    position._exchange = _worker_exchange
+    outcomes = [Account._apply(position, transaction) for transaction in transactions]
+    # Sent back to the parent process, which attaches its own exchange.
+    return _without_exchange(position), outcomes
+
+
+def _without_exchange(position: AccountPosition) -> AccountPosition:
+    """A shallow copy of the position without its exchange, to be re-attached after passing it to another process."""
+    detached = copy(position)
+    del detached._exchange
+    return detached
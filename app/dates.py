@@ -0,0 +1,37 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Tuple
+
+# Fixed-width layouts: total length, offsets of the year, month and day, and the separator with its positions.
+_LAYOUTS: Dict[str, Tuple[int, int, int, int, str, Tuple[int, ...]]] = {
+    "%d-%m-%Y": (10, 6, 3, 0, "-", (2, 5)),
+    "%d/%m/%Y": (10, 6, 3, 0, "/", (2, 5)),
+    "%Y-%m-%d": (10, 0, 5, 8, "-", (4, 7)),
+    "%Y%m%d": (8, 0, 4, 6, "", ()),
+}
+
+# Statements contain many rows per day, so even a small cache catches almost all of them.
+_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_date(value: str, fmt: str) -> datetime:
+    """
+    Same as datetime.strptime(value, fmt), but dates in one of the fixed-width layouts above
+    are sliced at fixed offsets instead of going through the (slow) generic parser.
+    """
+    layout = _LAYOUTS.get(fmt)
+    if layout is not None:
+        length, year, month, day, separator, separators = layout
+        digits = value.replace(separator, "") if separator else value
+        valid = len(value) == length and len(digits) == 8 and digits.isascii() and digits.isdigit()
+        if valid and all(value[i] == separator for i in separators):
+            return datetime(int(value[year : year + 4]), int(value[month : month + 2]), int(value[day : day + 2]))
+    return datetime.strptime(value, fmt)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_date_time(date: str, time: str, fmt: str) -> datetime:
+    """Parses a date (see parse_date) together with a separate 'HH:MM' time."""
+    hour, minute = time.split(":")[:2]
+    return parse_date(date, fmt).replace(hour=int(hour), minute=int(minute))
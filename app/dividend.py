@@ -3,9 +3,10 @@ from decimal import Decimal
 from datetime import datetime
 
 from .exchange import Currency
+from .money import TAX_RATE
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Dividend:
 
     value: Decimal
@@ -14,7 +15,7 @@ class Dividend:
     currency: Currency
 
     def tax_to_pay(self) -> Decimal:
-        tax_total = self.value * Decimal(0.19)
+        tax_total = self.value * TAX_RATE
         payable = tax_total - self.tax_deducted
         if payable <= 0:
             return Decimal(0)
@@ -5,16 +5,18 @@ from datetime import datetime
 from .exchange import Currency
 
 
-@dataclass
+@dataclass(slots=True)
 class StockEquity:
     quantity: Decimal
     quantity_total: Decimal
     price: Decimal
     date: datetime
     currency: Currency
+    # Cumulative stock split factor of the position at the time of buying (see app.lots.Lots).
+    split_factor: Decimal = Decimal(1)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RealizedChange:
     date_buy: datetime
     date_sell: datetime
@@ -23,3 +25,9 @@ class RealizedChange:
     price_sell: Decimal
     profit: Decimal
     currency: Currency
+    # Exchange ratios (currency -> PLN) used at the time of buying and selling.
+    ratio_buy: Decimal
+    ratio_sell: Decimal
+    # Cost basis and proceeds of the sold quantity, in PLN.
+    cost: Decimal
+    proceeds: Decimal
@@ -8,6 +8,40 @@ class Currency(Enum):
     PLN = "PLN"
     EUR = "EUR"
     USD = "USD"
+    # Remaining currencies published in the NBP table A.
+    AUD = "AUD"
+    BGN = "BGN"
+    BRL = "BRL"
+    CAD = "CAD"
+    CHF = "CHF"
+    CLP = "CLP"
+    CNY = "CNY"
+    CZK = "CZK"
+    DKK = "DKK"
+    GBP = "GBP"
+    HKD = "HKD"
+    HRK = "HRK"
+    HUF = "HUF"
+    IDR = "IDR"
+    ILS = "ILS"
+    INR = "INR"
+    ISK = "ISK"
+    JPY = "JPY"
+    KRW = "KRW"
+    MXN = "MXN"
+    MYR = "MYR"
+    NOK = "NOK"
+    NZD = "NZD"
+    PHP = "PHP"
+    RON = "RON"
+    RUB = "RUB"
+    SEK = "SEK"
+    SGD = "SGD"
+    THB = "THB"
+    TRY = "TRY"
+    UAH = "UAH"
+    XDR = "XDR"
+    ZAR = "ZAR"
 
 
 class Exchange:
@@ -1 +1,2 @@
+from .cached import Cached
 from .nbp import NBP
@@ -0,0 +1,58 @@
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from typing import Tuple
+
+from app.exchange import Currency, Exchange
+
+_Key = Tuple[int, Currency, Currency, int]
+
+
+class Cached(Exchange):
+    """
+    Remembers the rates returned by the wrapped exchange, evicting the least recently used ones beyond maxsize.
+    Rates are keyed by the day (time of the day is ignored), the currencies and the number of days to check;
+    lookups which fail (e.g. no published rate) are not cached.
+    """
+
+    _exchange: Exchange
+    _rates: "OrderedDict[_Key, Decimal]"
+    maxsize: int
+    hits: int
+    misses: int
+
+    def __init__(self, exchange: Exchange, maxsize: int = 4096):
+        if maxsize <= 0:
+            raise ValueError(f"invalid size of the cache: {maxsize}")
+        self._exchange = exchange
+        self._rates = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._rates)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        self._rates.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def ratio(self, day: datetime, c_from: Currency, c_to: Currency, max_days_prior_to_check: int = 5) -> Decimal:
+        key = (day.toordinal(), c_from, c_to, max_days_prior_to_check)
+        rate = self._rates.get(key)
+        if rate is not None:
+            self.hits += 1
+            self._rates.move_to_end(key)
+            return rate
+        self.misses += 1
+        rate = self._exchange.ratio(day, c_from, c_to, max_days_prior_to_check)
+        self._rates[key] = rate
+        if len(self._rates) > self.maxsize:
+            self._rates.popitem(last=False)
+        return rate
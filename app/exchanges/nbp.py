@@ -1,45 +1,205 @@
 import csv
-from datetime import datetime, timedelta
-from typing import Dict
+import pickle
+import re
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from decimal import Decimal
-from os import listdir
-from os.path import isfile, join
+from os import listdir, makedirs, replace, stat
+from os.path import dirname, isfile, join
 
 
+from app import instrumentation
+from app.dates import parse_date
 from app.exchange import Currency, Exchange
 
 
+# Rates in the NBP tables are published with (at least) 4 decimal places (e.g. '4,3811' or '3.6998');
+# some of the older tables have more of them for some currencies.
+_DECIMAL_PLACES = 4
+
+_CURRENCIES = {currency.value: currency for currency in Currency}
+
+# Header of a rate column: units of the currency and its code (e.g. '1USD', '100JPY', '10000IDR').
+_COLUMN = re.compile(r"^(\d+)([A-Z]{3})$")
+
+# Days of a single file and, per currency, the exponent of its scaled rates and the rates (None if not published).
+_Table = Tuple[List[int], Dict[Currency, Tuple[int, List[Optional[int]]]]]
+
+
 class NBP(Exchange):
     """
     NBP Exchange stands for "National Bank of Poland" exchange.
     It provides the 'standard' exchange rates for currencies (applicable for Polish citizens).
+
+    Rates are kept in a columnar form: one array of scaled integers per currency,
+    with a row for every published table. The value of a single unit of the currency
+    is `rate * 10**-exponent` (e.g. 100JPY = 3,3469 PLN is stored as 33469 with exponent 6).
     """
 
-    _day_currency_ratio: Dict[datetime, Dict[Currency, Decimal]]
+    # Day (as proleptic Gregorian ordinal) on which the table of a given row was published.
+    _days: array
+    # Per currency: scaled rate for each row (-1 if the currency was not published in that table).
+    _rates: Dict[Currency, array]
+    _exponents: Dict[Currency, int]
+    # Day (as proleptic Gregorian ordinal) of the first entry in the calendar index.
+    _first_day: int
+    # Per currency, for every calendar day: the row of the last rate published strictly before that day (or -1).
+    _day_row: Dict[Currency, array]
+    # Per currency: rates already converted to Decimal, filled lazily on lookup.
+    _decimals: Dict[Currency, List[Optional[Decimal]]]
+
+    # Bump whenever the layout of the cached calendar changes.
+    _cache_version = 2
+
+    def __init__(self, folder: str = "data/nbp", cache: bool = True):
+        self._decimals = {}
+        with instrumentation.stage("nbp tables") as stage:
+            self._open(folder, cache)
+            stage.items += len(self._days)
 
-    def __init__(self, folder: str = "data/nbp"):
-        files = [f for f in listdir(folder) if isfile(join(folder, f))]
-        self._day_ratio: Dict[datetime, Dict[Currency, Decimal]] = {}
-        for file in files:
-            self._load(join(folder, file))
+    def _open(self, folder: str, cache: bool):
+        files = sorted(f for f in listdir(folder) if isfile(join(folder, f)))
+        cache_file = join(folder, ".cache", "nbp.pickle")
+        signature = self._signature(folder, files)
+        if cache and self._load_cache(cache_file, signature):
+            instrumentation.count("nbp_cache.hits")
+            return
+        instrumentation.count("nbp_cache.misses")
 
-    def _load(self, file_name: str):
+        self._build([self._load(join(folder, file)) for file in files])
+
+        if cache:
+            self._save_cache(cache_file, signature)
+
+    def _signature(self, folder: str, files: List[str]) -> Tuple:
+        """Identifies the source tables; any modified, added or removed file invalidates the cache."""
+        stats = [stat(join(folder, f)) for f in files]
+        return (self._cache_version, tuple((f, s.st_mtime_ns, s.st_size) for f, s in zip(files, stats)))
+
+    def _state(self) -> Tuple:
+        return self._days, self._rates, self._exponents, self._first_day, self._day_row
+
+    def _load_cache(self, cache_file: str, signature: Tuple) -> bool:
+        try:
+            with open(cache_file, "rb") as f:
+                cached_signature, state = pickle.load(f)
+        except Exception:  # missing or unreadable cache is rebuilt from the source tables
+            return False
+        if cached_signature != signature:
+            return False
+        self._days, self._rates, self._exponents, self._first_day, self._day_row = state
+        return True
+
+    def _save_cache(self, cache_file: str, signature: Tuple):
+        try:
+            makedirs(dirname(cache_file), exist_ok=True)
+            with open(cache_file + ".tmp", "wb") as f:
+                pickle.dump((signature, self._state()), f, protocol=pickle.HIGHEST_PROTOCOL)
+            replace(cache_file + ".tmp", cache_file)
+        except OSError:
+            pass  # caching is best effort (e.g. read-only data folder)
+
+    @staticmethod
+    def _places(value: str) -> int:
+        return len(value.replace(",", ".").partition(".")[2])
+
+    @staticmethod
+    def _parse_rate(value: str, places: int = _DECIMAL_PLACES) -> Optional[int]:
+        """Returns the rate as an integer number of 10**-places units; places must not be less than the rate has."""
+        if value == "":
+            return None  # currency was not quoted in this table (e.g. RUB in 2022)
+        whole, _, fraction = value.replace(",", ".").partition(".")
+        return int(whole + fraction.ljust(places, "0"))
+
+    @staticmethod
+    def _load(file_name: str) -> _Table:
         with open(file_name, "r") as f:
             reader = csv.reader(f, delimiter=";")
-            currencies = next(reader)  # skip header row (which contains description of columns)
-            index_eur, index_usd = 0, 0
-            for i, currency in enumerate(currencies):
-                if currency == "1USD":
-                    index_usd = i
-                elif currency == "1EUR":
-                    index_eur = i
+            header = next(reader)  # header row contains units and codes of the currencies
+            columns: List[Tuple[int, Currency, int]] = []
+            for i, column in enumerate(header):
+                m = _COLUMN.match(column)
+                if not m:
+                    continue  # date and table number columns
+                units = m.group(1)
+                if units.strip("0") != "1":
+                    raise ValueError(f"unexpected units of the NBP rate {column}")
+                currency = _CURRENCIES.get(m.group(2))
+                if currency is None:
+                    continue  # currency withdrawn from (or not yet added to) the table A, see Currency
+                columns.append((i, currency, len(units) - 1))
+
+            days: List[int] = []
+            values: Dict[Currency, List[str]] = {currency: [] for _, currency, _ in columns}
             for row in reader:
-                date = datetime.strptime(row[0], "%Y%m%d")
-                ratios = {
-                    Currency.EUR: Decimal(row[index_eur].replace(",", ".")),
-                    Currency.USD: Decimal(row[index_usd].replace(",", ".")),
-                }
-                self._day_ratio[date] = ratios
+                if not row:
+                    continue
+                days.append(parse_date(row[0], "%Y%m%d").toordinal())
+                for i, currency, _ in columns:
+                    values[currency].append(row[i])
+
+        table: Dict[Currency, Tuple[int, List[Optional[int]]]] = {}
+        for _, currency, zeros in columns:
+            places = max([_DECIMAL_PLACES] + [NBP._places(value) for value in values[currency]])
+            table[currency] = (places + zeros, [NBP._parse_rate(value, places) for value in values[currency]])
+        return days, table
+
+    def _build(self, tables: List[_Table]):
+        days = sorted({day for table_days, _ in tables for day in table_days})
+        row_of_day = {day: row for row, day in enumerate(days)}
+        self._days = array("l", days)
+
+        self._exponents = {}
+        for _, columns in tables:
+            for currency, (exponent, _) in columns.items():
+                self._exponents[currency] = max(exponent, self._exponents.get(currency, 0))
+
+        self._rates = {}
+        for currency, exponent in self._exponents.items():
+            rates = array("q", [-1]) * len(days)
+            for table_days, columns in tables:
+                if currency not in columns:
+                    continue
+                table_exponent, values = columns[currency]
+                scale = 10 ** (exponent - table_exponent)
+                for day, value in zip(table_days, values):
+                    if value is not None:
+                        rates[row_of_day[day]] = value * scale
+            self._rates[currency] = rates
+
+        self._build_calendar()
+
+    def _build_calendar(self):
+        self._day_row = {}
+        if len(self._days) == 0:
+            self._first_day = 0
+            return
+
+        self._first_day = self._days[0]
+        # The rate for a given day is the one published on the previous business day,
+        # so the index covers one extra day after the last table.
+        size = self._days[-1] - self._first_day + 2
+
+        for currency, rates in self._rates.items():
+            day_row = array("i", [-1]) * size
+            row, last = 0, -1
+            for i in range(size):
+                day_row[i] = last
+                if row < len(self._days) and self._days[row] == self._first_day + i:
+                    if rates[row] >= 0:
+                        last = row
+                    row += 1
+            self._day_row[currency] = day_row
+
+    def _decimal(self, currency: Currency, row: int) -> Decimal:
+        decimals = self._decimals.get(currency)
+        if decimals is None:
+            decimals = self._decimals[currency] = [None] * len(self._days)
+        rate = decimals[row]
+        if rate is None:
+            rate = decimals[row] = Decimal(self._rates[currency][row]).scaleb(-self._exponents[currency])
+        return rate
 
     def ratio(
         self,
@@ -50,10 +210,19 @@ class NBP(Exchange):
     ) -> Decimal:
         if c_from is Currency.PLN:
             return Decimal(1)
-        day = day - timedelta(days=1)
-        try:
-            return self._day_ratio[day.replace(hour=0, minute=0)][c_from]
-        except KeyError as e:
-            if max_days_prior_to_check <= 0:
-                raise e
-            return self.ratio(day, c_from, c_to, max_days_prior_to_check=max_days_prior_to_check - 1)
+        ordinal = day.toordinal()
+        day_row = self._day_row[c_from]
+        # Days after the last published table all resolve to the last entry of the index.
+        i = ordinal - self._first_day
+        row = day_row[i] if 0 <= i < len(day_row) else (day_row[-1] if i >= 0 else -1)
+        if row < 0:
+            raise KeyError(day)
+        age = ordinal - self._days[row]
+        if age > 1 and age > max_days_prior_to_check + 1:
+            raise KeyError(day)
+        decimals = self._decimals.get(c_from)
+        if decimals is not None:
+            rate = decimals[row]
+            if rate is not None:
+                return rate
+        return self._decimal(c_from, row)
@@ -0,0 +1,153 @@
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, Optional, TypeVar
+
+from .dates import parse_date, parse_date_time
+from .exchange import Currency, Exchange
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class Stage:
+    # Wall time and number of processed items (rows, transactions, years, ...).
+    seconds: float = 0.0
+    items: int = 0
+
+
+class Stats:
+    """
+    Wall time of the stages of a run together with counters (e.g. of exchange rate lookups and cache hits).
+    Stages may nest, e.g. statements parsed lazily while transactions are processed.
+    """
+
+    stages: Dict[str, Stage]
+    counters: Dict[str, int]
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+
+    def stage(self, name: str) -> Stage:
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = Stage()
+        return stage
+
+    def count(self, counter: str, n: int = 1):
+        self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def count_caches(self):
+        """Adds counters of the in-memory caches, which keep their own statistics."""
+        for name, cached in [("parse_date", parse_date), ("parse_date_time", parse_date_time)]:
+            info = cached.cache_info()
+            self.count(f"{name}.cache_hits", info.hits)
+            self.count(f"{name}.cache_misses", info.misses)
+
+    def as_dict(self) -> Dict:
+        return {"stages": {name: asdict(stage) for name, stage in self.stages.items()}, "counters": self.counters}
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict(), indent=2)
+
+    def to_text(self) -> str:
+        lines = [f"{'stage':<32} {'time':>10} {'items':>10}"]
+        for name, stage in self.stages.items():
+            lines.append(f"{name:<32} {stage.seconds:>9.3f}s {stage.items:>10}")
+        lines.append("")
+        lines.append(f"{'counter':<32} {'value':>21}")
+        for name, value in self.counters.items():
+            lines.append(f"{name:<32} {value:>21}")
+        return "\n".join(lines)
+
+
+# Statistics of the current run; None unless enabled, in which case the calls below do (almost) nothing.
+_active: Optional[Stats] = None
+
+
+def enable() -> Stats:
+    global _active
+    _active = Stats()
+    return _active
+
+
+def disable():
+    global _active
+    _active = None
+
+
+def active() -> Optional[Stats]:
+    return _active
+
+
+@contextmanager
+def stage(name: str) -> Iterator[Stage]:
+    """Measures the wall time of the block; the caller may add the number of processed items to the stage."""
+    if _active is None:
+        yield Stage()
+        return
+    record = _active.stage(name)
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds += time.perf_counter() - started
+
+
+def count(counter: str, n: int = 1):
+    if _active is not None:
+        _active.count(counter, n)
+
+
+def counted(counter: str, items: Iterable[T]) -> Iterable[T]:
+    """Counts the items as they are consumed."""
+    if _active is None:
+        return items
+    return _counted(_active, counter, items)
+
+
+def _counted(stats: Stats, counter: str, items: Iterable[T]) -> Iterator[T]:
+    stats.count(counter, 0)
+    for item in items:
+        stats.counters[counter] += 1
+        yield item
+
+
+def timed(name: str, items: Iterable[T]) -> Iterable[T]:
+    """Measures the time spent producing the items (e.g. of a generator) and counts them."""
+    if _active is None:
+        return items
+    return _timed(_active.stage(name), iter(items))
+
+
+def _timed(record: Stage, items: Iterator[T]) -> Iterator[T]:
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(items)
+        except StopIteration:
+            record.seconds += time.perf_counter() - started
+            return
+        record.seconds += time.perf_counter() - started
+        record.items += 1
+        yield item
+
+
+class InstrumentedExchange(Exchange):
+    """Counts and times the exchange rate lookups of the wrapped exchange."""
+
+    def __init__(self, exchange: Exchange, stats: Stats):
+        self._exchange = exchange
+        self._lookups = stats.stage("fx lookups")
+
+    def ratio(self, day: datetime, c_from: Currency, c_to: Currency, max_days_prior_to_check: int = 5) -> Decimal:
+        started = time.perf_counter()
+        try:
+            return self._exchange.ratio(day, c_from, c_to, max_days_prior_to_check)
+        finally:
+            self._lookups.seconds += time.perf_counter() - started
+            self._lookups.items += 1
@@ -0,0 +1,198 @@
+from array import array
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .exchange import Currency
+from .transaction import Transaction, Activity
+
+_EPOCH = date(1970, 1, 1).toordinal()
+_ACTIVITIES = list(Activity)
+_CURRENCIES = list(Currency)
+_ACTIVITY_CODE = {activity: code for code, activity in enumerate(_ACTIVITIES)}
+_CURRENCY_CODE = {currency: code for code, currency in enumerate(_CURRENCIES)}
+
+# Columns of decimal values, each stored as integer coefficients next to their exponents.
+_VALUES = ["quantity", "price", "amount", "dividend_tax_deducted"]
+# Coefficient of a value kept as Decimal aside from the columns (see Ledger._exact).
+_EXACT = -(2**63)
+# Coefficients of up to 18 digits fit into int64 (typecode 'q') and exponents into int8 (typecode 'b').
+_MAX_DIGITS = 18
+_EXPONENTS = range(-128, 128)
+
+
+def pack(value: Decimal) -> Optional[Tuple[int, int]]:
+    """Returns the coefficient and the exponent of the value, or None if they don't fit into the columns."""
+    if not value.is_finite():
+        return None
+    sign, digits, exponent = value.as_tuple()
+    if len(digits) > _MAX_DIGITS or exponent not in _EXPONENTS or (sign and not value):
+        return None  # negative zero is kept aside as well, its sign would be lost
+    return int(value.scaleb(-exponent)), exponent  # type: ignore[arg-type]
+
+
+def unpack(coefficient: int, exponent: int) -> Decimal:
+    """Inverse of pack: the same value with the same exponent (e.g. 1.50 stays 1.50)."""
+    return Decimal(coefficient).scaleb(exponent)
+
+
+def epoch_day(year: int) -> int:
+    """Day (counted from 1970-01-01) on which the year starts."""
+    return date(year, 1, 1).toordinal() - _EPOCH
+
+
+class Ledger:
+    """
+    Transactions stored column by column in compact arrays, rather than as one object per transaction:
+    dates as days since 1970-01-01 (plus microseconds within the day), activities and currencies as small codes,
+    symbols as ids of interned strings, and quantities, prices and amounts as integer coefficients with exponents.
+    Conversion is lossless: a value whose coefficient or exponent does not fit (e.g. more than 18 digits)
+    is kept as Decimal aside from the columns.
+
+    A ledger is built from already parsed transactions, so it makes keeping them (e.g. until the report
+    is computed) cheaper; it does not reduce the memory needed while the statements are parsed.
+    """
+
+    trade_day: array
+    trade_time: array
+    settle_day: array
+    settle_time: array
+    activity: array
+    currency: array
+    symbol: array
+    quantity: array
+    quantity_exponent: array
+    price: array
+    price_exponent: array
+    amount: array
+    amount_exponent: array
+    dividend_tax_deducted: array
+    dividend_tax_deducted_exponent: array
+
+    symbols: List[str]
+    _symbol_ids: Dict[str, int]
+    # Per value column: values (by row) which do not fit into the column, their coefficient is _EXACT.
+    _exact: Dict[str, Dict[int, Decimal]]
+
+    def __init__(self):
+        self.trade_day = array("i")
+        self.trade_time = array("q")
+        self.settle_day = array("i")
+        self.settle_time = array("q")
+        self.activity = array("b")
+        self.currency = array("b")
+        self.symbol = array("i")
+        for name in _VALUES:
+            setattr(self, name, array("q"))
+            setattr(self, name + "_exponent", array("b"))
+        self.symbols = []
+        self._symbol_ids = {}
+        self._exact = {name: {} for name in _VALUES}
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Transaction]) -> "Ledger":
+        ledger = cls()
+        ledger.extend(transactions)
+        return ledger
+
+    def __len__(self) -> int:
+        return len(self.trade_day)
+
+    def __iter__(self) -> Iterator[Transaction]:
+        for i in range(len(self)):
+            yield self.transaction(i)
+
+    def _columns(self) -> List[array]:
+        columns = [
+            self.trade_day,
+            self.trade_time,
+            self.settle_day,
+            self.settle_time,
+            self.activity,
+            self.currency,
+            self.symbol,
+        ]
+        for name in _VALUES:
+            columns += [getattr(self, name), getattr(self, name + "_exponent")]
+        return columns
+
+    def symbol_id(self, symbol: str) -> int:
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self._symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return symbol_id
+
+    @staticmethod
+    def _day_time(value: datetime) -> Tuple[int, int]:
+        if value.tzinfo is not None:
+            raise ValueError(f"{value} has a time zone, transactions are in local time")
+        time = ((value.hour * 60 + value.minute) * 60 + value.second) * 10**6 + value.microsecond
+        return value.toordinal() - _EPOCH, time
+
+    def append(self, transaction: Transaction):
+        trade_day, trade_time = self._day_time(transaction.trade_date)
+        settle_day, settle_time = self._day_time(transaction.settle_date)
+        row = [
+            trade_day,
+            trade_time,
+            settle_day,
+            settle_time,
+            _ACTIVITY_CODE[transaction.activity],
+            _CURRENCY_CODE[transaction.currency],
+            self.symbol_id(transaction.symbol),
+        ]
+        i = len(self)
+        for name in _VALUES:
+            value = getattr(transaction, name)
+            packed = pack(value)
+            if packed is None:
+                self._exact[name][i] = value
+                packed = _EXACT, 0
+            row += packed
+        # Values are converted before anything is appended, so a failed conversion leaves the columns aligned.
+        for column, value in zip(self._columns(), row):
+            column.append(value)
+
+    def extend(self, transactions: Iterable[Transaction]):
+        for transaction in transactions:
+            self.append(transaction)
+
+    @staticmethod
+    def _datetime(day: int, time: int) -> datetime:
+        return datetime.fromordinal(day + _EPOCH) + timedelta(microseconds=time)
+
+    def trade_date(self, i: int) -> datetime:
+        return self._datetime(self.trade_day[i], self.trade_time[i])
+
+    def settle_date(self, i: int) -> datetime:
+        return self._datetime(self.settle_day[i], self.settle_time[i])
+
+    def _value(self, name: str, i: int) -> Decimal:
+        coefficient = getattr(self, name)[i]
+        if coefficient == _EXACT:
+            return self._exact[name][i]
+        return unpack(coefficient, getattr(self, name + "_exponent")[i])
+
+    def transaction(self, i: int) -> Transaction:
+        return Transaction(
+            trade_date=self.trade_date(i),
+            settle_date=self.settle_date(i),
+            currency=_CURRENCIES[self.currency[i]],
+            activity=_ACTIVITIES[self.activity[i]],
+            symbol=self.symbols[self.symbol[i]],
+            quantity=self._value("quantity", i),
+            price=self._value("price", i),
+            amount=self._value("amount", i),
+            dividend_tax_deducted=self._value("dividend_tax_deducted", i),
+        )
+
+    def sort(self):
+        """Sorts the rows by trade date; rows with the same trade date keep their order."""
+        order = sorted(range(len(self)), key=lambda i: (self.trade_day[i], self.trade_time[i]))
+        if all(i == position for position, i in enumerate(order)):
+            return
+        for column in self._columns():
+            column[:] = array(column.typecode, [column[i] for i in order])
+        row_of = {i: row for row, i in enumerate(order)}
+        self._exact = {name: {row_of[i]: value for i, value in exact.items()} for name, exact in self._exact.items()}
@@ -0,0 +1,73 @@
+from collections import deque
+from dataclasses import replace
+from decimal import Decimal
+from typing import Deque, Iterator
+
+from .equity import StockEquity
+
+
+class Lots:
+    """
+    FIFO queue of the open positions (lots) of a single stock.
+    The total quantity is kept up to date, so it never has to be summed over all lots.
+
+    Stock splits are applied lazily: lots keep their original quantity and price
+    (expressed in shares from before any later split) together with the cumulative
+    split factor at the time of buying. Quantities and prices in the current units
+    are derived from the ratio of the position's factor to the lot's factor.
+    """
+
+    _lots: Deque[StockEquity]
+    quantity: Decimal
+    factor: Decimal
+
+    def __init__(self):
+        self._lots = deque()
+        self.quantity = Decimal(0)
+        self.factor = Decimal(1)
+
+    def __len__(self) -> int:
+        return len(self._lots)
+
+    def __iter__(self) -> Iterator[StockEquity]:
+        return iter(self._lots)
+
+    def append(self, lot: StockEquity):
+        """Adds a lot bought at the current split factor (see StockEquity.split_factor)."""
+        self._lots.append(lot)
+        self.quantity += self.quantity_of(lot)
+
+    def first(self) -> StockEquity:
+        return self._lots[0]
+
+    def quantity_of(self, lot: StockEquity) -> Decimal:
+        if lot.split_factor == self.factor:
+            return lot.quantity
+        return lot.quantity * self.factor / lot.split_factor
+
+    def price_of(self, lot: StockEquity) -> Decimal:
+        if lot.split_factor == self.factor:
+            return lot.price
+        return lot.price * lot.split_factor / self.factor
+
+    def adjusted(self) -> Iterator[StockEquity]:
+        """Yields copies of the lots with quantity and price expressed in the current units."""
+        for lot in self._lots:
+            yield replace(lot, quantity=self.quantity_of(lot), price=self.price_of(lot), split_factor=self.factor)
+
+    def consume(self, quantity: Decimal):
+        """Removes quantity (in the current units) from the earliest lot; it must not exceed that lot."""
+        lot = self._lots[0]
+        if lot.split_factor == self.factor:
+            lot.quantity -= quantity
+        else:
+            lot.quantity -= quantity * lot.split_factor / self.factor
+        self.quantity -= quantity
+        # If we sold all quantity from the earliest position, remove it.
+        if round(lot.quantity, 15) == 0:
+            self._lots.popleft()
+            self.quantity -= self.quantity_of(lot)
+
+    def split(self, ratio: Decimal):
+        self.factor *= ratio
+        self.quantity *= ratio
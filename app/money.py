@@ -0,0 +1,5 @@
+from decimal import Decimal
+
+# Polish income tax rate (19%) for capital gains and dividends.
+# Built from the float literal on purpose: results stay identical to the ones computed with Decimal(0.19) so far.
+TAX_RATE = Decimal(0.19)
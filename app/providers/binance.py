@@ -1,22 +1,29 @@
 import csv
-from os import listdir
-from os.path import isfile, join
+from os.path import join
 
+from app.dates import parse_date
+from app.providers.cache import StatementCache
+from app.providers.files import list_files, parse_files
 from app.transfer import *
 
 
 class Binance(TransferProvider):
     _transfers: list[Transfer]
 
-    def __init__(self, folder: str = "data/investing/binance") -> None:
+    # Bump whenever parsing changes, so statements cached by the previous version are parsed again.
+    _parser_version = 2
+
+    def __init__(self, folder: str = "data/investing/binance", processes: int = 1, cache: bool = True) -> None:
         super().__init__()
+        self.processes = processes
+        self._cache = StatementCache(join(folder, ".cache")) if cache else None
         self._transfers = self._parse_folder(folder)
 
     def _parse_folder(self, folder: str) -> List[Transfer]:
-        files = [f for f in listdir(folder) if isfile(join(folder, f))]
+        parser = f"Binance:{self._parser_version}"
         transactions = []
-        for file in files:
-            transactions += self._parse_file(join(folder, file))
+        for file_transactions in parse_files(self._parse_file, list_files(folder), self.processes, self._cache, parser):
+            transactions += file_transactions
         return transactions
 
     def _parse_file(self, file_name: str) -> List[Transfer]:
@@ -28,7 +35,7 @@ class Binance(TransferProvider):
             except StopIteration:
                 return []
             for row in reader:
-                time_at = datetime.strptime(row[1].split(" ")[0], "%Y-%m-%d")  # 2021-01-04 15:14:23
+                time_at = parse_date(row[1].split(" ")[0], "%Y-%m-%d")  # 2021-01-04 15:14:23
                 operation = self._parse_operation(row[3])
                 currency = self._parse_currency(row[4])
                 change = Decimal(row[5])
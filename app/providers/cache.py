@@ -0,0 +1,57 @@
+import hashlib
+import pickle
+from os import listdir, makedirs, remove, replace
+from os.path import abspath, join
+from typing import Any, Optional, Tuple
+
+
+class StatementCache:
+    """
+    Stores records parsed from statement files, so unchanged statements do not have to be parsed again.
+    Entries are keyed by the hash of the file content together with the parser (name and version),
+    which means that editing a statement or changing the parser simply results in a new entry;
+    the entry it replaces (of the same file and parser name) is removed.
+    The output printed while parsing (e.g. warnings about unknown products) is stored with the records.
+    """
+
+    folder: str
+
+    def __init__(self, folder: str):
+        self.folder = folder
+
+    @staticmethod
+    def key(file_name: str, parser: str) -> str:
+        # The prefix identifies the entries of the file and parser, whatever their content and version.
+        name = parser.split(":")[0]
+        source = hashlib.sha256(f"{abspath(file_name)}\0{name}".encode()).hexdigest()[:16]
+        digest = hashlib.sha256()
+        with open(file_name, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        digest.update(b"\0" + parser.encode())
+        return f"{source}-{digest.hexdigest()}"
+
+    def load(self, key: str) -> Optional[Tuple[Any, str]]:
+        """Returns the records and the output printed while parsing them."""
+        try:
+            with open(join(self.folder, key + ".pickle"), "rb") as f:
+                return pickle.load(f)
+        except Exception:  # missing or unreadable entry, the statement is parsed again
+            return None
+
+    def store(self, key: str, records: Any, output: str = ""):
+        file_name = join(self.folder, key + ".pickle")
+        try:
+            makedirs(self.folder, exist_ok=True)
+            with open(file_name + ".tmp", "wb") as f:
+                pickle.dump((records, output), f, protocol=pickle.HIGHEST_PROTOCOL)
+            replace(file_name + ".tmp", file_name)
+            self._remove_replaced(key)
+        except OSError:
+            pass  # caching is best effort (e.g. read-only data folder)
+
+    def _remove_replaced(self, key: str):
+        source = key.split("-")[0] + "-"
+        for name in listdir(self.folder):
+            if name.startswith(source) and name.endswith(".pickle") and name != key + ".pickle":
+                remove(join(self.folder, name))
@@ -1,15 +1,21 @@
 import csv
+import hashlib
 import re
+from typing import Dict
+from typing import Iterator
 from typing import Optional
 from typing import List
 from typing import Tuple
+from dataclasses import dataclass, replace
 from datetime import datetime
 from decimal import Decimal
-from os import listdir
-from os.path import isfile, join
-
+from os.path import join
+from app.dates import parse_date, parse_date_time
+from app.providers.cache import StatementCache
+from app.providers.files import list_files, parse_files
+from app.providers.matcher import ProductMatcher
 from app.transaction import Transaction, Activity
-from app.transaction_provider import TransactionProvider
+from app.transaction_provider import TransactionProvider, merge_streams, sorted_stream
 from app.exchange import Currency
 
 
@@ -17,9 +23,36 @@ class DegiroRowIgnorable(BaseException):
     pass
 
 
+class DegiroDividendTaxUnpaired(Exception):
+    """Tax of a dividend which is not in the same statement (it's paired with the last dividend of earlier ones)."""
+
+
+@dataclass
+class DegiroStatement:
+    transactions: List[Transaction]
+    # Tax rows preceding any dividend of the statement, with the index (in transactions) at which they belong.
+    unpaired_taxes: List[Tuple[int, List[str]]]
+    # Last dividend of the statement, the taxes of following statements may belong to it.
+    last_dividend: Optional[Transaction]
+
+    def __len__(self) -> int:
+        return len(self.transactions)
+
+
+# Description of a cash fund conversion (e.g. 'Konwersja funduszu gotówkowego: Zakup 12,5 przy 0,9 EUR')
+# or of a trade (e.g. 'Kupno 10 APPLE INC@130,5 USD').
+_ACTION = re.compile(
+    r"Konwersja funduszu gotówkowego: (?P<fund>Sprzedaż|Zakup) (?P<fund_quantity>.*) przy (?P<fund_price>.*) EUR"
+    r"|(?P<trade>Sprzedaż|Kupno) (?P<quantity>[\d ]+) (.*)@(?P<price>[0-9,\xa0]+) (?P<currency>[A-Z]+)"
+)
+
+
 class Degiro(TransactionProvider):
     folder: str
 
+    # Bump whenever parsing changes, so statements cached by the previous version are parsed again.
+    _parser_version = 2
+
     _product_to_symbol_map = {
         "TESLA": "TSLA",
         "INVITAE CORPORATION": "NVTA",
@@ -57,95 +90,147 @@ class Degiro(TransactionProvider):
         "HONEST CO INC/THE": "HNST",
     }
 
-    def __init__(self, folder: str = "data/investing/degiro", print_invalid_lines: bool = False):
+    _isin_to_symbol: Dict[str, str]
+    _product_matcher: ProductMatcher
+
+    def __init__(
+        self,
+        folder: str = "data/investing/degiro",
+        print_invalid_lines: bool = False,
+        processes: int = 1,
+        symbols_file: Optional[str] = None,
+        cache: bool = True,
+    ):
         self.folder = folder
         self.print_invalid_lines = print_invalid_lines
+        self.processes = processes
+        self._dividend = None
+
+        product_to_symbol = dict(self._product_to_symbol_map)
+        self._isin_to_symbol = {}
+        if symbols_file:
+            self._load_symbols(symbols_file, product_to_symbol)
+        self._product_matcher = ProductMatcher(product_to_symbol)
+
+        self._cache = StatementCache(join(folder, ".cache")) if cache else None
+        # Parsed statements depend on the translations to symbols as well.
+        symbols = repr((list(product_to_symbol.items()), sorted(self._isin_to_symbol.items())))
+        self._parser = f"Degiro:{self._parser_version}:{hashlib.sha256(symbols.encode()).hexdigest()}"
 
-    def _product_to_symbol(self, product: str) -> str:
-        for p, symbol in self._product_to_symbol_map.items():
-            if p in product:
+    def _load_symbols(self, file_name: str, product_to_symbol: Dict[str, str]):
+        """
+        Loads additional translations from a CSV file with columns: Symbol,Product,ISIN
+        (e.g. 'AAPL,APPLE INC,US0378331005'); either the product or the ISIN may be left empty.
+        """
+        with open(file_name, "r") as f:
+            reader = csv.reader(f, delimiter=",")
+            try:
+                next(reader)  # skip header row (which contains description of columns)
+            except StopIteration:
+                return
+            for row in reader:
+                if not row:
+                    continue
+                symbol, product, isin = (row + ["", ""])[:3]
+                if product:
+                    product_to_symbol[product] = symbol
+                if isin:
+                    self._isin_to_symbol[isin] = symbol
+
+    def _product_to_symbol(self, product: str, isin: str = "") -> str:
+        if isin:
+            symbol = self._isin_to_symbol.get(isin)
+            if symbol is not None:
                 return symbol
-        raise Exception(f"unknown product {product}")
+        symbol = self._product_matcher.find(product)
+        if symbol is None:
+            raise Exception(f"unknown product {product}")
+        if isin:
+            self._isin_to_symbol[isin] = symbol
+        return symbol
+
+    def _parse_files(self) -> List[List[Transaction]]:
+        files = list_files(self.folder)
+        statements = parse_files(self._provide_for_file, files, self.processes, self._cache, self._parser)
+        return self._pair_dividends(statements)
 
     def provide_transactions(self) -> List[Transaction]:
-        files = [f for f in listdir(self.folder) if isfile(join(self.folder, f))]
         transactions = []
-        for file in files:
-            transactions += self._provide_for_file(join(self.folder, file))
+        for file_transactions in self._parse_files():
+            transactions += file_transactions
         return transactions
 
-    def _description_to_action(self, description: str) -> Tuple[Activity, Decimal, Decimal, Currency]:
-        m = re.search("(Sprzedaż|Kupno) ([\d ]+) (.*)@([0-9,\\xa0]+) ([A-Z]+)", description)
-        if not m or len(m.groups()) != 5:
-            raise DegiroRowIgnorable()
-        groups = m.groups()
+    def stream_transactions(self) -> Iterator[Transaction]:
+        return merge_streams(sorted_stream(transactions) for transactions in self._parse_files())
 
+    def _parse_trade(self, row: List[str], action: re.Match) -> Transaction:
         activity = Activity.BUY
-        if groups[0] == "Sprzedaż":
+        if action.group("trade") == "Sprzedaż":
             activity = Activity.SELL
-        quantity = Decimal(groups[1].replace("\xa0", ""))
-        price = Decimal(groups[3].replace(",", ".").replace("\xa0", ""))
-        currency = Currency(groups[4])
+        quantity = Decimal(action.group("quantity").replace("\xa0", ""))
+        price = Decimal(action.group("price").replace(",", ".").replace("\xa0", ""))
+        currency = Currency(action.group("currency"))
+        symbol = self._product_to_symbol(row[3], row[4])
 
-        return activity, quantity, price, currency
+        trade_date, settle_date = self._parse_dates(row)
+
+        return Transaction(
+            trade_date=trade_date,  # 20/04/1969
+            settle_date=settle_date,  # 20/04/1969
+            currency=currency,  # USD
+            activity=activity,  # BUY,SELL
+            symbol=symbol,  # AAPL
+            quantity=quantity,  # 100
+            price=price,  # 420.69
+            amount=quantity * price,  # 42069
+            dividend_tax_deducted=Decimal(0),
+        )
 
     _dividend: Optional[Transaction]
 
     def _parse_dates(self, row: List[str]) -> Tuple[datetime, datetime]:
-        settle_date = datetime.strptime(row[0], "%d-%m-%Y")
-        trade_date = datetime.strptime(row[2], "%d-%m-%Y")
-        trade_date_time_hour = int(row[1].split(":")[0])
-        trade_date_time_minutes = int(row[1].split(":")[1])
-        trade_date = trade_date.replace(hour=trade_date_time_hour, minute=trade_date_time_minutes)
+        settle_date = parse_date(row[0], "%d-%m-%Y")
+        trade_date = parse_date_time(row[2], row[1], "%d-%m-%Y")
         return trade_date, settle_date
 
-    def _parse_dividend(self, row: List[str]) -> Optional[Transaction]:
-        if "Dywidend" not in row[5]:
-            return None
-
-        if row[5] == "Dywidenda":
-            settle_date, trade_date = self._parse_dates(row)
-            self._dividend = Transaction(
-                trade_date=trade_date,  # 20/04/1969
-                settle_date=settle_date,  # 20/04/1969
-                currency=Currency(row[7]),  # USD
-                activity=Activity.DIV,  # BUY,SELL
-                symbol=self._product_to_symbol(row[3]),  # AAPL
-                quantity=Decimal(0),  # 100
-                price=Decimal(0),  # 420.69
-                amount=Decimal(row[8].replace(",", ".")),  # 42069
-                dividend_tax_deducted=Decimal(0),
-            )
-            return None
+    def _parse_dividend(self, row: List[str]):
+        settle_date, trade_date = self._parse_dates(row)
+        self._dividend = Transaction(
+            trade_date=trade_date,  # 20/04/1969
+            settle_date=settle_date,  # 20/04/1969
+            currency=Currency(row[7]),  # USD
+            activity=Activity.DIV,  # BUY,SELL
+            symbol=self._product_to_symbol(row[3], row[4]),  # AAPL
+            quantity=Decimal(0),  # 100
+            price=Decimal(0),  # 420.69
+            amount=Decimal(row[8].replace(",", ".")),  # 42069
+            dividend_tax_deducted=Decimal(0),
+        )
 
-        if row[5] == "Podatek Dywidendowy":
-            transaction = self._dividend
-            transaction.dividend_tax_deducted = Decimal(row[8].replace(",", ".")) * -1  # type: ignore[union-attr]
-            return transaction
+    @staticmethod
+    def _dividend_tax(row: List[str]) -> Decimal:
+        return Decimal(row[8].replace(",", ".")) * -1
 
-        return None
+    def _parse_dividend_tax(self, row: List[str]) -> Transaction:
+        transaction = self._dividend
+        if transaction is None:
+            raise DegiroDividendTaxUnpaired()
+        transaction.dividend_tax_deducted = self._dividend_tax(row)
+        return transaction
 
-    def _parse_fundshare_cash_fund(self, row: List[str]) -> Optional[Transaction]:
+    def _parse_fundshare_cash_fund(self, row: List[str], action: re.Match) -> Transaction:
         if "FUNDSHARE UCITS EUR CASH FUND" not in row[3]:
-            return None
-        if "Konwersja funduszu gotówkowego: " not in row[5]:
-            return None
-        action_description = row[5].replace("Konwersja funduszu gotówkowego: ", "")
-
-        m = re.search("(Sprzedaż|Zakup) (.*) przy (.*) EUR", action_description)
-        if not m or len(m.groups()) != 3:
-            return None
+            raise DegiroRowIgnorable()
 
-        groups = m.groups()
-        v1 = Decimal(groups[1].replace("\xa0", "").replace(",", "."))
-        v2 = Decimal(groups[2].replace("\xa0", "").replace(",", "."))
+        v1 = Decimal(action.group("fund_quantity").replace("\xa0", "").replace(",", "."))
+        v2 = Decimal(action.group("fund_price").replace("\xa0", "").replace(",", "."))
         activity = Activity.SELL
-        if groups[0] == "Zakup":
+        if action.group("fund") == "Zakup":
             activity = Activity.BUY
 
         trade_date, settle_date = self._parse_dates(row)
 
-        transaction = Transaction(
+        return Transaction(
             trade_date=trade_date,  # 20/04/1969
             settle_date=settle_date,  # 20/04/1969
             currency=Currency.EUR,  # EUR
@@ -157,33 +242,44 @@ class Degiro(TransactionProvider):
             dividend_tax_deducted=Decimal(0),
         )
 
-        return transaction
+    def _parse_row(self, row: List[str]) -> Optional[Transaction]:
+        """Classifies the row by its description (column 'Opis') and parses it accordingly."""
+        description = row[5]
+        if description == "Dywidenda":
+            # Dividend is returned together with its tax, which is in one of the following rows.
+            self._parse_dividend(row)
+            return None
+        if description == "Podatek Dywidendowy":
+            return self._parse_dividend_tax(row)
 
-    def _provide_for_file(self, file_name: str) -> List[Transaction]:
-        transactions = []
+        action = _ACTION.search(description)
+        if not action:
+            raise DegiroRowIgnorable()
+        if action.group("fund"):
+            return self._parse_fundshare_cash_fund(row, action)
+        return self._parse_trade(row, action)
+
+    def _provide_for_file(self, file_name: str) -> DegiroStatement:
+        # Statements are parsed independently (possibly in other processes), so taxes of dividends
+        # from earlier statements are left to _pair_dividends.
+        self._dividend = None
+        transactions: List[Transaction] = []
+        unpaired_taxes: List[Tuple[int, List[str]]] = []
         with open(file_name, "r") as f:
             reader = csv.reader(f, delimiter=",")
             try:
                 next(reader)  # skip header row (which contains description of columns)
             except StopIteration:
-                return []
+                return DegiroStatement([], [], None)
             for row in reader:
                 # Data,Czas,Data,Produkt,ISIN,Opis,Kurs,Zmiana,,Saldo,,Identyfikator zlecenia
-                transaction = self._parse_dividend(row)
-                if transaction:
-                    transactions.append(transaction)
-                    continue
-
-                transaction = self._parse_fundshare_cash_fund(row)
-                if transaction:
-                    transactions.append(transaction)
-                    continue
-
                 try:
-                    activity, quantity, price, currency = self._description_to_action(row[5])
-                    symbol = self._product_to_symbol(row[3])
+                    transaction = self._parse_row(row)
                 except DegiroRowIgnorable:
                     continue
+                except DegiroDividendTaxUnpaired:
+                    unpaired_taxes.append((len(transactions), row))
+                    continue
                 except KeyError:
                     print("Missing stock name translation to symbol. See app/providers/degiro.py file.", row[3])
                     continue
@@ -194,20 +290,27 @@ class Degiro(TransactionProvider):
                     print("EXCEPTION", row, e)
                     raise e
 
-                trade_date, settle_date = self._parse_dates(row)
-
-                transaction = Transaction(
-                    trade_date=trade_date,  # 20/04/1969
-                    settle_date=settle_date,  # 20/04/1969
-                    currency=currency,  # USD
-                    activity=activity,  # BUY,SELL
-                    symbol=symbol,  # AAPL
-                    quantity=quantity,  # 100
-                    price=price,  # 420.69
-                    amount=quantity * price,  # 42069
-                    dividend_tax_deducted=Decimal(0),
-                )
+                if transaction:
+                    transactions.append(transaction)
 
-                transactions.append(transaction)
+        return DegiroStatement(transactions, unpaired_taxes, self._dividend)
 
-        return transactions
+    def _pair_dividends(self, statements: List[DegiroStatement]) -> List[List[Transaction]]:
+        """
+        Pairs the taxes which precede any dividend of their statement with the last dividend
+        of the earlier statements (in the order of the files), as if all of them were read one after another.
+        """
+        dividend: Optional[Transaction] = None
+        results = []
+        for statement in statements:
+            transactions = list(statement.transactions)
+            # Inserted from the last one, so the indexes of the remaining ones stay valid.
+            for i, row in reversed(statement.unpaired_taxes):
+                if dividend is None:
+                    print("Dividend tax without a dividend.", row)
+                    continue
+                transactions.insert(i, replace(dividend, dividend_tax_deducted=self._dividend_tax(row)))
+            if statement.last_dividend is not None:
+                dividend = statement.last_dividend
+            results.append(transactions)
+        return results
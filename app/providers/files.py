@@ -0,0 +1,77 @@
+import io
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import partial
+from os import listdir
+from os.path import isfile, join
+from typing import Callable, List, Optional, Sized, Tuple, TypeVar
+
+from app import instrumentation
+from app.providers.cache import StatementCache
+
+# Records parsed from a single file (e.g. a list of transactions).
+R = TypeVar("R", bound=Sized)
+T = TypeVar("T")
+
+
+def list_files(folder: str) -> List[str]:
+    """Returns paths of the files in the folder, in a deterministic (sorted by name) order."""
+    return [join(folder, f) for f in sorted(listdir(folder)) if isfile(join(folder, f))]
+
+
+def _parse(parse: Callable[[str], T], files: List[str], processes: int) -> List[T]:
+    if processes <= 1 or len(files) <= 1:
+        return [parse(file) for file in files]
+    with ProcessPoolExecutor(max_workers=min(processes, len(files))) as executor:
+        return list(executor.map(parse, files))
+
+
+def _parse_with_output(parse: Callable[[str], R], file: str) -> Tuple[R, str]:
+    """Parses the file, returns the records together with the output printed while parsing."""
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output):
+            records = parse(file)
+    except Exception:
+        # Nothing is cached for a file which failed to parse, its output (e.g. the offending row) is printed now.
+        print(output.getvalue(), end="")
+        raise
+    return records, output.getvalue()
+
+
+def parse_files(
+    parse: Callable[[str], R],
+    files: List[str],
+    processes: int = 1,
+    cache: Optional[StatementCache] = None,
+    parser: str = "",
+) -> List[R]:
+    """
+    Parses every file and returns the results in the order of the files.
+    With processes > 1 the files are fanned out to a pool of processes, so `parse` has to be picklable
+    and must not depend on any state carried over from previously parsed files.
+    With a cache, only files not parsed before by the same parser (see StatementCache) are parsed
+    and the output printed while parsing the files is printed in their order, whether they are parsed or not.
+    """
+    # Stages are named after the parser without its version, e.g. 'parse Revolut.transactions'.
+    with instrumentation.stage(f"parse {parser.split(':')[0]}".rstrip()) as stage:
+        if cache is None:
+            results = _parse(parse, files, processes)
+        else:
+            keys = [cache.key(file, parser) for file in files]
+            entries = [cache.load(key) for key in keys]
+            missing = [i for i, entry in enumerate(entries) if entry is None]
+            parsed = _parse(partial(_parse_with_output, parse), [files[i] for i in missing], processes)
+            for i, (records, output) in zip(missing, parsed):
+                entries[i] = (records, output)
+                cache.store(keys[i], records, output)
+            instrumentation.count("statement_cache.hits", len(files) - len(missing))
+            instrumentation.count("statement_cache.misses", len(missing))
+
+            results = []
+            for records, output in entries:  # type: ignore[misc]
+                # The output (e.g. warnings) of a cached statement is printed as if it was parsed again.
+                print(output, end="")
+                results.append(records)
+        stage.items += sum(len(records) for records in results)
+    return results
@@ -0,0 +1,78 @@
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class ProductMatcher:
+    """
+    Finds which of many patterns occur in a product name in a single pass (Aho–Corasick automaton).
+    If several patterns occur in the name, the value of the pattern given first wins,
+    i.e. the result is the same as checking the patterns one by one in order.
+    """
+
+    # Per state of the automaton: transitions, failure link and the earliest pattern matched in that state.
+    _goto: List[Dict[str, int]]
+    _fail: List[int]
+    _match: List[Optional[int]]
+    _values: List[str]
+
+    def __init__(self, patterns: Dict[str, str]):
+        self._goto = [{}]
+        self._fail = [0]
+        self._match = [None]
+        self._values = []
+        for priority, (pattern, value) in enumerate(patterns.items()):
+            self._add(pattern, priority)
+            self._values.append(value)
+        self._build()
+
+    def _add(self, pattern: str, priority: int):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._match.append(None)
+            state = next_state
+        if self._match[state] is None:
+            self._match[state] = priority
+
+    @staticmethod
+    def _earliest(a: Optional[int], b: Optional[int]) -> Optional[int]:
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return min(a, b)
+
+    def _build(self):
+        # Breadth-first, so failure links always point to already processed (shallower) states.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail if fail != next_state else 0
+                self._match[next_state] = self._earliest(self._match[next_state], self._match[self._fail[next_state]])
+                queue.append(next_state)
+
+    def find(self, text: str) -> Optional[str]:
+        best: Optional[int] = None
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            match = self._match[state]
+            if match is not None and (best is None or match < best):
+                best = match
+                if best == 0:
+                    break
+        if best is None:
+            return None
+        return self._values[best]
@@ -1,12 +1,14 @@
 import csv
-from typing import List
-import datetime
+import sys
+from typing import Iterator, List
 from decimal import Decimal
-from os import listdir, stat
-from os.path import isfile, join
+from os.path import basename, join
 
 from app.transaction import Transaction, Activity
-from app.transaction_provider import TransactionProvider
+from app.dates import parse_date
+from app.providers.cache import StatementCache
+from app.providers.files import list_files, parse_files
+from app.transaction_provider import TransactionProvider, merge_streams, sorted_stream
 from app.transfer import TransferProvider
 from app.transfer import Operation, Transfer
 from app.exchange import Currency
@@ -15,28 +17,43 @@ from app.exchange import Currency
 class Revolut(TransactionProvider, TransferProvider):
     folder: str
 
-    def __init__(self, folder: str = "data/investing/revolut", print_invalid_lines: bool = False):
+    # Bump whenever parsing changes, so statements cached by the previous version are parsed again.
+    _parser_version = 2
+
+    def __init__(
+        self,
+        folder: str = "data/investing/revolut",
+        print_invalid_lines: bool = False,
+        processes: int = 1,
+        cache: bool = True,
+    ):
         self.folder = folder
         self.print_invalid_lines = print_invalid_lines
+        self.processes = processes
+        self._cache = StatementCache(join(folder, ".cache")) if cache else None
 
     def provide_transfers(self) -> List[Transfer]:
-        files = [f for f in listdir(self.folder) if isfile(join(self.folder, f))]
+        files = [f for f in list_files(self.folder) if "crypto" in basename(f)]
+        parser = f"Revolut.transfers:{self._parser_version}"
         transfers = []
-        for file in files:
-            if "crypto" not in file:
-                continue
-            transfers += self._provide_transfers_from(join(self.folder, file))
+        for file_transfers in parse_files(self._provide_transfers_from, files, self.processes, self._cache, parser):
+            transfers += file_transfers
         return transfers
 
+    def _parse_transaction_files(self) -> List[List[Transaction]]:
+        files = [f for f in list_files(self.folder) if "crypto" not in basename(f)]
+        parser = f"Revolut.transactions:{self._parser_version}"
+        return parse_files(self._provide_transactions_from, files, self.processes, self._cache, parser)
+
     def provide_transactions(self) -> List[Transaction]:
-        files = [f for f in listdir(self.folder) if isfile(join(self.folder, f))]
         transactions = []
-        for file in files:
-            if "crypto" in file:
-                continue
-            transactions += self._provide_transactions_from(join(self.folder, file))
+        for file_transactions in self._parse_transaction_files():
+            transactions += file_transactions
         return transactions
 
+    def stream_transactions(self) -> Iterator[Transaction]:
+        return merge_streams(sorted_stream(transactions) for transactions in self._parse_transaction_files())
+
     @staticmethod
     def _provide_transfers_from(file_name: str) -> List[Transfer]:
         transfers = []
@@ -51,7 +68,7 @@ class Revolut(TransactionProvider, TransferProvider):
                 # Note: This is my custom format that I manually created.
                 #   For this reason, there is no easy way to extract information from Revolut for this Provider.
                 #   Feel free to create your own file to provide crypto transfers data.
-                date = datetime.datetime.strptime(row[0], "%d-%m-%Y")
+                date = parse_date(row[0], "%d-%m-%Y")
                 operation = Operation.WITHDRAW
                 value = Decimal(row[6])
                 currency = Currency.PLN
@@ -77,7 +94,7 @@ class Revolut(TransactionProvider, TransferProvider):
                 return []
             for row in reader:
                 # Date,Ticker,Type,Quantity,Price per share,Total Amount,Currency,FX Rate
-                date = datetime.datetime.strptime(row[0].split(" ")[0], "%d/%m/%Y")
+                date = parse_date(row[0].split(" ")[0], "%d/%m/%Y")
 
                 try:
                     activity = Activity(row[2])
@@ -109,7 +126,7 @@ class Revolut(TransactionProvider, TransferProvider):
                     settle_date=date,  # 20/04/1969
                     currency=currency,  # USD
                     activity=activity,  # BUY,SELL
-                    symbol=row[1],  # AAPL
+                    symbol=sys.intern(row[1]),  # AAPL
                     quantity=quantity,  # 100
                     price=price,  # 420.69
                     amount=amount,  # 42069
@@ -0,0 +1,81 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Iterable, Iterator, List, Tuple
+
+from .equity import RealizedChange
+
+
+def year_period(year: int) -> Tuple[datetime, datetime]:
+    return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+
+
+def month_period(year: int, month: int) -> Tuple[datetime, datetime]:
+    if not 1 <= month <= 12:
+        raise ValueError(f"invalid month: {month}")
+    if month == 12:
+        return datetime(year, 12, 1), datetime(year + 1, 1, 1)
+    return datetime(year, month, 1), datetime(year, month + 1, 1)
+
+
+def quarter_period(year: int, quarter: int) -> Tuple[datetime, datetime]:
+    if not 1 <= quarter <= 4:
+        raise ValueError(f"invalid quarter: {quarter}")
+    start, _ = month_period(year, 3 * quarter - 2)
+    _, end = month_period(year, 3 * quarter)
+    return start, end
+
+
+class RealizedChanges:
+    """
+    Realized changes ordered by the date of selling, so the changes of a period are found by bisection.
+    Changes are realized in the order of transactions, so appending almost always goes to the end;
+    a change sold earlier than the last one is inserted after the changes sold on the same date.
+    """
+
+    _changes: List[RealizedChange]
+    _sell_dates: List[datetime]
+
+    def __init__(self, changes: Iterable[RealizedChange] = ()):
+        self._changes = []
+        self._sell_dates = []
+        self.extend(changes)
+
+    def __len__(self) -> int:
+        return len(self._changes)
+
+    def __iter__(self) -> Iterator[RealizedChange]:
+        return iter(self._changes)
+
+    def __getitem__(self, i: int) -> RealizedChange:
+        return self._changes[i]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, RealizedChanges):
+            return self._changes == other._changes
+        return self._changes == other
+
+    def __repr__(self) -> str:
+        return f"RealizedChanges({self._changes!r})"
+
+    def append(self, change: RealizedChange):
+        date = change.date_sell
+        if self._sell_dates and date < self._sell_dates[-1]:
+            i = bisect_right(self._sell_dates, date)
+            self._sell_dates.insert(i, date)
+            self._changes.insert(i, change)
+            return
+        self._sell_dates.append(date)
+        self._changes.append(change)
+
+    def extend(self, changes: Iterable[RealizedChange]):
+        for change in changes:
+            self.append(change)
+
+    def between(self, start: datetime, end: datetime) -> List[RealizedChange]:
+        """Returns the changes sold in [start, end)."""
+        i = bisect_left(self._sell_dates, start)
+        j = bisect_left(self._sell_dates, end, i)
+        return self._changes[i:j]
+
+    def in_year(self, year: int) -> List[RealizedChange]:
+        return self.between(*year_period(year))
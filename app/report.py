@@ -0,0 +1,74 @@
+from typing import Iterator, List, Optional, Tuple
+
+from . import instrumentation
+from .account import Account
+from .exchange import Exchange
+from .snapshot import SnapshotStore
+from .transaction_provider import TransactionProvider, merge_transactions
+from .transfer import Crypto, Transfer, TransferProvider
+
+
+def report(
+    year: int,
+    exchange: Exchange,
+    transaction_providers: List[TransactionProvider],
+    transfer_providers: List[TransferProvider],
+):
+    """Prints the report of a single account for the fiscal year: stocks, dividends and crypto transfers."""
+    report_years(year, year, exchange, transaction_providers, transfer_providers)
+
+
+def report_years(
+    first_year: int,
+    last_year: int,
+    exchange: Exchange,
+    transaction_providers: List[TransactionProvider],
+    transfer_providers: List[TransferProvider],
+    snapshots: Optional[SnapshotStore] = None,
+):
+    """
+    Prints the reports of a single account for every fiscal year of the range.
+    Transactions are processed once; each report is the same as the one printed for that year alone.
+    With snapshots, processing resumes from the latest snapshot of the account (see SnapshotStore).
+    """
+    # Statements (all parsed up front) are merged by trade date, without concatenating them into one sorted list.
+    # They are parsed when the first transaction is needed, so the stage is timed while the stream is consumed
+    # (which happens within the 'account' stage).
+    transactions = instrumentation.timed("statements", merge_transactions(transaction_providers))
+    years: Iterator[Tuple[int, Account]]
+    if snapshots is None:
+        account = Account(exchange)
+        processed = account.do_sorted_transactions_by_year(transactions, first_year, last_year)
+        years = ((year, account) for year in processed)
+    else:
+        years = snapshots.replay(exchange, transactions, first_year, last_year)
+    crypto: Optional[Crypto] = None
+
+    for year, account in instrumentation.timed("account", years):
+        if year > first_year:
+            print("")
+
+        # === Stocks ===
+
+        with instrumentation.stage("report"):
+            account.print_stocks(show_summary_per_stock=True, year=year)
+            account.print_dividends(year=year)
+
+        # # Debug current positions (validate with your portfolio):
+        # account.print_current_positions()
+
+        # Print out all taxable transactions (sells) with buy information.
+        # This should contain everything you need to evaluate the tax.
+        # account.print_stocks_transactions()
+
+        # === Crypto ===
+
+        if crypto is None:
+            with instrumentation.stage("transfers") as stage:
+                transfers: List[Transfer] = []
+                for transfer_provider in transfer_providers:
+                    transfers += transfer_provider.provide_transfers()
+                crypto = Crypto(transfers, exchange)
+                stage.items += len(transfers)
+        with instrumentation.stage("report"):
+            crypto.print_summary(year=year)
@@ -0,0 +1,143 @@
+import hashlib
+import pickle
+from os import listdir, makedirs, remove, replace
+from os.path import isfile, join
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .account import Account
+from .exchange import Exchange
+from .transaction import Transaction
+
+
+class _Pickler(pickle.Pickler):
+    """Pickles the exchange of the account by reference, so it is not stored in snapshots."""
+
+    def __init__(self, file, exchange: Exchange):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._exchange = exchange
+
+    def persistent_id(self, obj) -> Optional[str]:
+        return "exchange" if obj is self._exchange else None
+
+
+class _Unpickler(pickle.Unpickler):
+    """Restores a snapshot with the exchange given in place of the one it was stored with."""
+
+    def __init__(self, file, exchange: Exchange):
+        super().__init__(file)
+        self._exchange = exchange
+
+    def persistent_load(self, pid: str) -> Exchange:
+        if pid != "exchange":
+            raise pickle.UnpicklingError(f"unknown persistent id: {pid}")
+        return self._exchange
+
+
+class SnapshotStore:
+    """
+    Stores snapshots of an Account (open lots, realized changes, dividends and summaries) at the end of every year,
+    so that a run can resume from the latest one and process only the transactions which came after it.
+
+    A snapshot is keyed by a hash of all transactions (in trade date order) it covers, so any change
+    to those transactions (e.g. a corrected statement) simply results in a different key;
+    storing it removes the snapshot of the same year it replaces.
+    Exchange rates of the past are assumed not to change.
+    """
+
+    folder: str
+
+    # Bump whenever the processing of transactions or the layout of Account changes.
+    _snapshot_version = 3
+
+    def __init__(self, folder: str):
+        self.folder = folder
+
+    def _file(self, key: str) -> str:
+        return join(self.folder, key + ".pickle")
+
+    def load(self, key: str, exchange: Exchange) -> Optional[Account]:
+        try:
+            with open(self._file(key), "rb") as f:
+                return _Unpickler(f, exchange).load()
+        except Exception:  # missing or unreadable snapshot, transactions are processed again
+            return None
+
+    def store(self, key: str, account: Account):
+        file_name = self._file(key)
+        try:
+            makedirs(self.folder, exist_ok=True)
+            with open(file_name + ".tmp", "wb") as f:
+                _Pickler(f, account._exchange).dump(account)
+            replace(file_name + ".tmp", file_name)
+            self._remove_replaced(key)
+        except OSError:
+            pass  # snapshots are best effort (e.g. read-only data folder)
+
+    def _remove_replaced(self, key: str):
+        # Snapshots of the same year taken before some of its (or earlier) transactions changed.
+        year = key.split("-")[0] + "-"
+        for name in listdir(self.folder):
+            if name.startswith(year) and name.endswith(".pickle") and name != key + ".pickle":
+                remove(join(self.folder, name))
+
+    @staticmethod
+    def _encode(transaction: Transaction) -> bytes:
+        t = transaction
+        return (
+            f"{t.trade_date.isoformat()}|{t.settle_date.isoformat()}|{t.currency.value}|{t.activity.value}|{t.symbol}"
+            f"|{t.quantity}|{t.price}|{t.amount}|{t.dividend_tax_deducted}\n"
+        ).encode()
+
+    def _year_ends(self, transactions: List[Transaction], last_year: int) -> Dict[int, Tuple[int, str]]:
+        """
+        For every year (up to last_year): the number of transactions up to its end and the key of its snapshot,
+        i.e. the year and the hash of those transactions.
+        """
+        digest = hashlib.sha256(f"snapshot:{self._snapshot_version}\n".encode())
+        ends: Dict[int, Tuple[int, str]] = {}
+        year = None
+        for i, transaction in enumerate(transactions):
+            if year is not None:
+                for y in range(year, transaction.trade_date.year):
+                    ends[y] = (i, f"{y}-{digest.hexdigest()}")
+            year = transaction.trade_date.year
+            digest.update(self._encode(transaction))
+        if year is not None:
+            for y in range(year, last_year + 1):
+                ends[y] = (len(transactions), f"{y}-{digest.hexdigest()}")
+        return ends
+
+    def replay(
+        self, exchange: Exchange, transactions: Iterable[Transaction], first_year: int, last_year: int
+    ) -> Iterator[Tuple[int, Account]]:
+        """
+        Same as Account.do_sorted_transactions_by_year, but starts from the latest snapshot taken at the end
+        of first_year or earlier, and stores snapshots at the ends of the following years.
+        Yields every year of the range together with the account in its state at the end of that year.
+        """
+        prefix: List[Transaction] = []
+        for transaction in transactions:
+            if transaction.trade_date.year > last_year:
+                break
+            prefix.append(transaction)
+        ends = self._year_ends(prefix, last_year)
+
+        account, start = None, 0
+        for year in sorted((y for y in ends if y <= first_year), reverse=True):
+            count, key = ends[year]
+            account = self.load(key, exchange)
+            if account is not None:
+                start = count
+                break
+        if account is None:
+            account = Account(exchange)
+
+        for year in range(first_year, last_year + 1):
+            count, key = ends.get(year, (0, ""))
+            if count > start:
+                for transaction in prefix[start:count]:
+                    account.do_transaction(transaction)
+                start = count
+                if not isfile(self._file(key)):
+                    self.store(key, account)
+            yield year, account
@@ -1,9 +1,59 @@
+import heapq
 from abc import abstractmethod
+from collections import deque
+from datetime import datetime
+from typing import Iterable, Iterator
 
+from .ledger import Ledger
 from .transaction import Transaction
 
 
+def _trade_date(transaction: Transaction) -> datetime:
+    return transaction.trade_date
+
+
+def sorted_stream(transactions: list[Transaction]) -> Iterator[Transaction]:
+    """Yields transactions in trade date order, dropping references to the already consumed ones."""
+    transactions.sort(key=_trade_date)
+    queue = deque(transactions)
+    transactions.clear()
+    while queue:
+        yield queue.popleft()
+
+
+def merge_streams(streams: Iterable[Iterator[Transaction]]) -> Iterator[Transaction]:
+    """
+    K-way merge of streams sorted by trade date; ties keep the order of the streams.
+    heapq.merge takes the first transaction of every stream right away, so streams of parsed statements
+    (see sorted_stream) are all parsed before the first transaction is yielded.
+    """
+    return heapq.merge(*streams, key=_trade_date)
+
+
+def merge_transactions(providers: Iterable["TransactionProvider"]) -> Iterator[Transaction]:
+    """
+    Merges the transactions of all providers by trade date. All statements are parsed up front,
+    only the concatenated (and sorted) list of all transactions is avoided.
+    """
+    return merge_streams(provider.stream_transactions() for provider in providers)
+
+
 class TransactionProvider:
     @abstractmethod
     def provide_transactions(self) -> list[Transaction]:
         raise NotImplementedError
+
+    def stream_transactions(self) -> Iterator[Transaction]:
+        """
+        Yields transactions in trade date order.
+        Providers reading several statements should override it to sort every statement separately
+        and merge them, instead of sorting one list of all transactions.
+        """
+        return sorted_stream(self.provide_transactions())
+
+    def provide_ledger(self) -> Ledger:
+        """
+        Returns the transactions (in trade date order) in the compact columnar form.
+        The statements are parsed into transactions first, see Ledger.
+        """
+        return Ledger.from_transactions(self.stream_transactions())
@@ -13,7 +13,7 @@ class Operation(Enum):
     WITHDRAW = "WITHDRAW"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Transfer:
     time_at: datetime
     operation: Operation
@@ -0,0 +1,101 @@
+"""
+tax_stocks batch: computes the reports of many accounts for a fiscal year.
+
+The manifest lists account directories, one per line (empty lines and lines starting with '#' are skipped);
+relative paths are relative to the directory of the manifest.
+An account directory contains the statements of the platforms it uses, each in its own folder:
+degiro/, revolut/ and binance/ (see README.md). The report is written to <account>/report_<year>.txt.
+
+Example: python batch.py accounts.txt 2021 --processes 8
+"""
+import argparse
+import multiprocessing
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from os.path import abspath, dirname, isdir, join
+from typing import List, Optional, Tuple
+
+import app
+from app.exchange import Exchange
+from app.transaction_provider import TransactionProvider
+from app.transfer import TransferProvider
+
+# Exchange rates shared by the worker processes, loaded once by the parent process.
+_exchange: Optional[Exchange] = None
+
+
+def read_manifest(file_name: str) -> List[str]:
+    """Returns the account directories of the manifest (relative ones resolved against the manifest's directory)."""
+    with open(file_name, "r") as f:
+        lines = [line.strip() for line in f]
+    base = dirname(abspath(file_name))
+    return [join(base, line) for line in lines if line and not line.startswith("#")]
+
+
+def _init_worker(exchange: Exchange):
+    global _exchange
+    _exchange = exchange
+
+
+def report_account(folder: str, year: int) -> Tuple[str, Optional[str]]:
+    """Writes the report of the account; returns its path and the error (if the report could not be computed)."""
+    report_file = join(folder, f"report_{year}.txt")
+    transaction_providers: List[TransactionProvider] = []
+    transfer_providers: List[TransferProvider] = []
+    try:
+        if isdir(join(folder, "degiro")):
+            transaction_providers.append(app.Degiro(join(folder, "degiro")))
+        if isdir(join(folder, "revolut")):
+            revolut = app.Revolut(join(folder, "revolut"))
+            transaction_providers.append(revolut)
+            transfer_providers.append(revolut)
+        if isdir(join(folder, "binance")):
+            transfer_providers.append(app.Binance(join(folder, "binance")))
+
+        with open(report_file, "w") as f, redirect_stdout(f):
+            app.print_report(year, _exchange, transaction_providers, transfer_providers)  # type: ignore[arg-type]
+    except Exception:
+        return report_file, traceback.format_exc()
+    return report_file, None
+
+
+def _executor(exchange: Exchange, processes: int) -> ProcessPoolExecutor:
+    if "fork" in multiprocessing.get_all_start_methods():
+        # Forked workers share the rate tables (compact arrays) of the parent copy-on-write.
+        return ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("fork"))
+    return ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(exchange,))
+
+
+def run(folders: List[str], year: int, exchange: Exchange, processes: int = 1) -> List[Tuple[str, Optional[str]]]:
+    """Writes the reports of all accounts, processes them concurrently with processes > 1."""
+    _init_worker(exchange)
+    if processes <= 1 or len(folders) <= 1:
+        return [report_account(folder, year) for folder in folders]
+    with _executor(exchange, min(processes, len(folders))) as executor:
+        return list(executor.map(report_account, folders, [year] * len(folders)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("manifest", help="file with the account directories")
+    parser.add_argument("year", type=int)
+    parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--nbp", default="data/nbp", help="folder with the NBP exchange rates")
+    args = parser.parse_args()
+
+    exchange = app.ExchangeNBP(args.nbp)
+    failed = 0
+    for report_file, error in run(read_manifest(args.manifest), args.year, exchange, args.processes):
+        if error is None:
+            print(report_file)
+        else:
+            failed += 1
+            print(f"FAILED {report_file}\n{error}", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
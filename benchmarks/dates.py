@@ -0,0 +1,43 @@
+"""
+Date parsing used by the providers (app.dates) compared to datetime.strptime.
+
+    python -m benchmarks.dates --values 1000000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from app.dates import parse_date
+
+
+def _measure(parse: Callable[[str, str], datetime], values: List[str], fmt: str) -> float:
+    started = time.perf_counter()
+    for value in values:
+        parse(value, fmt)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--values", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    # A statement spans a few years and has many rows per day.
+    days = [datetime(2015, 1, 1) + timedelta(days=rnd.randrange(365 * 8)) for _ in range(args.values)]
+    unique = [datetime(1900, 1, 1) + timedelta(days=i % 70000) for i in range(args.values)]
+
+    print(f"{'format':<10} {'dates':<8} {'strptime':>12} {'parse_date':>12} {'speedup':>8}")
+    for fmt in ["%d-%m-%Y", "%d/%m/%Y", "%Y-%m-%d", "%Y%m%d"]:
+        for name, dates in [("repeated", days), ("unique", unique)]:
+            values = [d.strftime(fmt) for d in dates]
+            parse_date.cache_clear()
+            baseline = _measure(datetime.strptime, values, fmt)
+            fast = _measure(parse_date, values, fmt)
+            print(f"{fmt:<10} {name:<8} {baseline:>11.2f}s {fast:>11.2f}s {baseline / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
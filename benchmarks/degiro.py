@@ -0,0 +1,36 @@
+"""
+Throughput of the Degiro statement parser on a synthetic statement.
+
+    python -m benchmarks.degiro --rows 1000000
+"""
+import argparse
+import tempfile
+import time
+from os.path import join
+
+from app.providers.degiro import Degiro
+from benchmarks.generators import generate_degiro
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        file_name = join(folder, "statement.csv")
+        generate_degiro(file_name, args.rows)
+
+        degiro = Degiro(folder)
+        started = time.perf_counter()
+        transactions = degiro._provide_for_file(file_name)
+        elapsed = time.perf_counter() - started
+
+    print(f"rows:         {args.rows}")
+    print(f"transactions: {len(transactions)}")
+    print(f"time:         {elapsed:.2f} s")
+    print(f"throughput:   {args.rows / elapsed:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
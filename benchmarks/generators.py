@@ -0,0 +1,161 @@
+import csv
+import random
+from os.path import join
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.providers.degiro import Degiro
+
+# Products known to the Degiro provider, together with made up ISINs.
+DEGIRO_PRODUCTS: List[Tuple[str, str]] = [
+    (product, f"US{i:09d}0") for i, product in enumerate(Degiro._product_to_symbol_map)
+]
+
+
+def _amount(value: float) -> str:
+    return f"{value:.2f}".replace(".", ",")
+
+
+def _step(rows: int, start: datetime, end: Optional[datetime]) -> timedelta:
+    """Rows are a minute apart, or spread evenly until the end date."""
+    if end is None:
+        return timedelta(minutes=1)
+    return max((end - start) / max(rows, 1), timedelta(seconds=1))
+
+
+def generate_degiro(
+    file_name: str, rows: int, start: datetime = datetime(2015, 1, 1), seed: int = 0, end: Optional[datetime] = None
+):
+    """
+    Writes a synthetic Degiro account statement with the given number of rows (newest first, as exported).
+    The statement mixes trades, dividends with their tax, cash fund conversions and rows which are ignored.
+    Products are never sold short, so the statement can be processed by an Account.
+    """
+    rnd = random.Random(seed)
+    step = _step(rows, start, end)
+    held: Dict[str, int] = {}
+    records: List[List[str]] = []
+    day = start
+    while len(records) < rows:
+        day += step
+        product, isin = rnd.choice(DEGIRO_PRODUCTS)
+        date, time = day.strftime("%d-%m-%Y"), day.strftime("%H:%M")
+        kind = rnd.random()
+        if kind < 0.70:
+            quantity, price = rnd.randint(1, 100), rnd.uniform(1, 1000)
+            action = "Kupno"
+            if rnd.random() >= 0.6 and held.get(product, 0) > 0:
+                action, quantity = "Sprzedaż", min(quantity, held[product])
+            held[product] = held.get(product, 0) + (quantity if action == "Kupno" else -quantity)
+            description = f"{action} {quantity} {product}@{_amount(price)} USD"
+            records.append([date, time, date, product, isin, description, "", "USD", _amount(quantity * price)])
+        elif kind < 0.80 and len(records) + 2 <= rows:
+            value = rnd.uniform(1, 100)
+            # Records are written in reverse, so the dividend ends up right before its tax.
+            records.append([date, time, date, product, isin, "Podatek Dywidendowy", "", "USD", _amount(-value * 0.15)])
+            records.append([date, time, date, product, isin, "Dywidenda", "", "USD", _amount(value)])
+        elif kind < 0.90:
+            # Units of the fund are counted in hundredths, as they are written with 2 decimal places.
+            units, action = rnd.randint(100, 100_000), "Zakup"
+            if rnd.random() >= 0.5 and held.get("#EUR", 0) > 0:
+                action, units = "Sprzedaż", min(units, held["#EUR"])
+            held["#EUR"] = held.get("#EUR", 0) + (units if action == "Zakup" else -units)
+            description = f"Konwersja funduszu gotówkowego: {action} {_amount(units / 100)} przy 0,9871 EUR"
+            fund = "FUNDSHARE UCITS EUR CASH FUND"
+            records.append([date, time, date, fund, "NL0011280581", description, "", "EUR", ""])
+        else:
+            description = rnd.choice(["Depozyt", "Opłata transakcyjna DEGIRO", "Zmiana ceny Fundusze pieniężne"])
+            records.append([date, time, date, product, isin, description, "", "EUR", _amount(rnd.uniform(-5, 5))])
+
+    with open(file_name, "w", newline="") as f:
+        writer = csv.writer(f, delimiter=",")
+        writer.writerow(["Data", "Czas", "Data", "Produkt", "ISIN", "Opis", "Kurs", "Zmiana", "", "Saldo", "", "Id"])
+        for record in reversed(records):
+            writer.writerow(record + ["", "", ""])
+
+
+def _symbols(count: int) -> List[str]:
+    return [f"S{i:04d}" for i in range(count)]
+
+
+def generate_revolut(
+    file_name: str,
+    rows: int,
+    start: datetime = datetime(2015, 1, 1),
+    end: Optional[datetime] = None,
+    symbols: int = 100,
+    seed: int = 0,
+):
+    """
+    Writes a synthetic Revolut statement (oldest first) with trades, dividends and stock splits of many symbols.
+    Symbols are never sold short, so the statement can be processed by an Account.
+    """
+    rnd = random.Random(seed)
+    step = _step(rows, start, end)
+    names = _symbols(symbols)
+    held: Dict[str, int] = {}
+    with open(file_name, "w", newline="") as f:
+        writer = csv.writer(f, delimiter=",")
+        header = ["Date", "Ticker", "Type", "Quantity", "Price per share", "Total Amount", "Currency", "FX Rate"]
+        writer.writerow(header)
+        day = start
+        for _ in range(rows):
+            day += step
+            symbol = rnd.choice(names)
+            date = day.strftime("%d/%m/%Y %H:%M:%S")
+            owned = held.get(symbol, 0)
+            kind = rnd.random()
+            if owned > 0 and kind < 0.05:
+                value = rnd.uniform(0.1, 10)
+                writer.writerow([date, symbol, "DIVIDEND", "", "", f"{value:.2f}", "USD", "3.9"])
+            elif owned > 0 and kind < 0.06:
+                extra = owned * rnd.choice([1, 2, 4])
+                held[symbol] = owned + extra
+                writer.writerow([date, symbol, "STOCK SPLIT", extra, "", "", "USD", "3.9"])
+            else:
+                quantity, price = rnd.randint(1, 50), rnd.uniform(1, 500)
+                activity = "BUY"
+                if owned > 0 and kind < 0.45:
+                    activity, quantity = "SELL", min(quantity, owned)
+                held[symbol] = owned + (quantity if activity == "BUY" else -quantity)
+                amount = f"{quantity * price:.2f}"
+                writer.writerow([date, symbol, activity, quantity, f"{price:.2f}", amount, "USD", "3.9"])
+
+
+def generate_binance(
+    file_name: str, rows: int, start: datetime = datetime(2015, 1, 1), end: Optional[datetime] = None, seed: int = 0
+):
+    """Writes a synthetic Binance transaction history with fiat deposits and withdrawals among other operations."""
+    rnd = random.Random(seed)
+    step = _step(rows, start, end)
+    with open(file_name, "w", newline="") as f:
+        writer = csv.writer(f, delimiter=",")
+        writer.writerow(["User_ID", "UTC_Time", "Account", "Operation", "Coin", "Change", "Remark"])
+        day = start
+        for _ in range(rows):
+            day += step
+            operation = rnd.choice(["Deposit", "Withdraw", "Buy", "Transaction Related"])
+            coin = rnd.choice(["EUR", "USD", "BTC"])
+            change = rnd.uniform(1, 1000) * (-1 if operation == "Withdraw" else 1)
+            writer.writerow([1, day.strftime("%Y-%m-%d %H:%M:%S"), "Spot", operation, coin, f"{change:.2f}", ""])
+
+
+# Currencies of the synthetic NBP tables, with the units of their quotes and the initial rates.
+NBP_CURRENCIES: List[Tuple[str, int, float]] = [("USD", 1, 3.8), ("EUR", 1, 4.3), ("GBP", 1, 4.9), ("JPY", 100, 3.4)]
+
+
+def generate_nbp(folder: str, first_year: int, last_year: int, seed: int = 0):
+    """Writes synthetic NBP tables (one file per year, a table on every weekday) with rates following a random walk."""
+    rnd = random.Random(seed)
+    rates = [rate for _, _, rate in NBP_CURRENCIES]
+    for year in range(first_year, last_year + 1):
+        with open(join(folder, f"{year}.csv"), "w", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["data"] + [f"{units}{code}" for code, units, _ in NBP_CURRENCIES] + ["nr tabeli"])
+            day, number = datetime(year, 1, 1), 0
+            while day.year == year:
+                if day.weekday() < 5:
+                    number += 1
+                    rates = [rate * rnd.uniform(0.99, 1.01) for rate in rates]
+                    writer.writerow([day.strftime("%Y%m%d")] + [f"{rate:.4f}" for rate in rates] + [number])
+                day += timedelta(days=1)
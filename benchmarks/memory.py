@@ -0,0 +1,59 @@
+"""
+Memory used per record by the record classes (slotted dataclasses) compared to the same classes
+with a per-instance __dict__ (plain dataclasses, as they were before).
+Field values are shared by all records, so only the records themselves are measured.
+
+    python -m benchmarks.memory --records 100000
+"""
+import argparse
+import tracemalloc
+from dataclasses import astuple, fields, make_dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List, Tuple
+
+from app.dividend import Dividend
+from app.equity import RealizedChange, StockEquity
+from app.exchange import Currency
+from app.transfer import Operation, Transfer
+
+_DATE = datetime(2021, 1, 4, 15, 30)
+_PRICE = Decimal("130.25")
+_RATIO = Decimal("3.6998")
+
+_SAMPLES: List[Any] = [
+    StockEquity(Decimal(10), Decimal(10), _PRICE, _DATE, Currency.USD),
+    RealizedChange(_DATE, _DATE, Decimal(10), _PRICE, _PRICE, Decimal(0), Currency.USD, _RATIO, _RATIO, _PRICE, _PRICE),
+    Dividend(Decimal("1.2"), Decimal("0.18"), _DATE, Currency.USD),
+    Transfer(_DATE, Operation.DEPOSIT, Currency.EUR, Decimal(100), "Deposit"),
+]
+
+
+def _measure(cls: type, values: Tuple, records: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [cls(*values) for _ in range(records)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del instances
+    return used / records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'record':<16} {'__dict__':>10} {'slots':>10} {'saved':>8}")
+    for sample in _SAMPLES:
+        cls = type(sample)
+        plain = make_dataclass(cls.__name__, [(f.name, f.type) for f in fields(cls)])
+        values = astuple(sample)
+        # Both figures include the list holding the records (8 bytes per record).
+        before = _measure(plain, values, args.records)
+        after = _measure(cls, values, args.records)
+        print(f"{cls.__name__:<16} {before:>9.0f}B {after:>9.0f}B {1 - after / before:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Times every stage of computing the reports of a synthetic account: parsing of the NBP tables and of
+the Degiro, Revolut and Binance statements, sorting, FIFO realization, exchange rate lookups and reporting.
+The results of a run are appended as a single JSON line to the output file, so they can be compared over time.
+
+    python -m benchmarks.suite --rows 1000000 --symbols 500 --output benchmark_results.jsonl
+"""
+import argparse
+import io
+import json
+import platform
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from decimal import Decimal
+from os import listdir, makedirs
+from os.path import join
+from typing import Any, Callable, Dict, List, TypeVar
+
+from app.account import Account
+from app.exchange import Currency, Exchange
+from app.exchanges.nbp import NBP
+from app.providers.binance import Binance
+from app.providers.degiro import Degiro
+from app.providers.revolut import Revolut
+from app.transaction import Transaction
+from app.transfer import Crypto
+from benchmarks.generators import generate_binance, generate_degiro, generate_nbp, generate_revolut
+
+T = TypeVar("T")
+
+# Shares of the rows written to the statements of each platform.
+_DEGIRO_ROWS, _REVOLUT_ROWS = 0.4, 0.5
+
+
+class _FixedExchange(Exchange):
+    """Constant rates, so the FIFO realization is timed without the exchange rate lookups."""
+
+    def ratio(self, day: datetime, c_from: Currency, c_to: Currency, max_days_prior_to_check: int = 5) -> Decimal:
+        return Decimal(1) if c_from is c_to else Decimal(4)
+
+
+def _timed(stages: Dict[str, Dict[str, float]], stage: str, items: int, run: Callable[[], T]) -> T:
+    started = time.perf_counter()
+    result = run()
+    seconds = time.perf_counter() - started
+    stages[stage] = {"seconds": round(seconds, 6), "items": items, "per_second": round(items / max(seconds, 1e-9), 1)}
+    return result
+
+
+def _generate(folder: str, rows: int, symbols: int, first_year: int, last_year: int, seed: int):
+    start, end = datetime(first_year, 1, 1), datetime(last_year, 12, 31)
+    for platform_folder in ["nbp", "degiro", "revolut", "binance"]:
+        makedirs(join(folder, platform_folder), exist_ok=True)
+    # The rates of the first days of the range were published in the previous year.
+    generate_nbp(join(folder, "nbp"), first_year - 1, last_year, seed=seed)
+    degiro_rows, revolut_rows = int(rows * _DEGIRO_ROWS), int(rows * _REVOLUT_ROWS)
+    generate_degiro(join(folder, "degiro", "statement.csv"), degiro_rows, start=start, end=end, seed=seed)
+    generate_revolut(join(folder, "revolut", "statement.csv"), revolut_rows, start, end, symbols, seed=seed)
+    generate_binance(join(folder, "binance", "statement.csv"), rows - degiro_rows - revolut_rows, start, end, seed)
+
+
+def _rows(folder: str) -> int:
+    """Rows of all statements (or tables) in the folder, without their headers."""
+    rows = 0
+    for file_name in listdir(folder):
+        with open(join(folder, file_name)) as f:
+            rows += sum(1 for _ in f) - 1
+    return rows
+
+
+def _lookup_rates(exchange: Exchange, transactions: List[Transaction]):
+    for transaction in transactions:
+        exchange.ratio(transaction.settle_date, transaction.currency, Currency.PLN)
+
+
+def _report(account: Account, crypto: Crypto, first_year: int, last_year: int) -> str:
+    output = io.StringIO()
+    with redirect_stdout(output):
+        for year in range(first_year, last_year + 1):
+            account.print_stocks(show_summary_per_stock=True, year=year)
+            account.print_dividends(year=year)
+            crypto.print_summary(year=year)
+    return output.getvalue()
+
+
+def run(folder: str, first_year: int, last_year: int) -> Dict[str, Dict[str, float]]:
+    """Times the stages on the statements generated in the folder; returns the timings per stage."""
+    stages: Dict[str, Dict[str, float]] = {}
+    exchange = _timed(stages, "parse_nbp", _rows(join(folder, "nbp")), lambda: NBP(join(folder, "nbp"), cache=False))
+
+    degiro = Degiro(join(folder, "degiro"), cache=False)
+    revolut = Revolut(join(folder, "revolut"), cache=False)
+    transactions = _timed(stages, "parse_degiro", _rows(join(folder, "degiro")), degiro.provide_transactions)
+    transactions += _timed(stages, "parse_revolut", _rows(join(folder, "revolut")), revolut.provide_transactions)
+    binance_folder = join(folder, "binance")
+    binance = _timed(stages, "parse_binance", _rows(binance_folder), lambda: Binance(binance_folder, cache=False))
+
+    count = len(transactions)
+    transactions = _timed(stages, "sort", count, lambda: sorted(transactions, key=lambda t: t.trade_date))
+
+    _timed(stages, "fx_lookups", count, lambda: _lookup_rates(exchange, transactions))
+
+    account = Account(_FixedExchange())
+    _timed(stages, "fifo", count, lambda: account.do_sorted_transactions(transactions, last_year))
+
+    # Realization together with the lookups of the NBP rates, as when computing the reports.
+    account = Account(exchange)
+    _timed(stages, "account", count, lambda: account.do_sorted_transactions(transactions, last_year))
+
+    transfers = revolut.provide_transfers() + binance.provide_transfers()
+    years = last_year - first_year + 1
+    _timed(stages, "report", years, lambda: _report(account, Crypto(transfers, exchange), first_year, last_year))
+    return stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="rows of all generated statements")
+    parser.add_argument("--symbols", type=int, default=100, help="symbols traded on Revolut")
+    parser.add_argument("--first-year", type=int, default=2019)
+    parser.add_argument("--last-year", type=int, default=2022)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.jsonl", help="file the results are appended to")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        _generate(folder, args.rows, args.symbols, args.first_year, args.last_year, args.seed)
+        stages = run(folder, args.first_year, args.last_year)
+
+    result: Dict[str, Any] = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "parameters": {k: v for k, v in vars(args).items() if k != "output"},
+        "stages": stages,
+    }
+    with open(args.output, "a") as f:
+        f.write(json.dumps(result) + "\n")
+
+    print(f"{'stage':<14} {'items':>10} {'time':>10} {'items/s':>12}")
+    for stage, timing in stages.items():
+        print(f"{stage:<14} {timing['items']:>10} {timing['seconds']:>9.3f}s {timing['per_second']:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,69 @@
+import argparse
+import cProfile
 import sys
+from typing import Tuple
 
 import app
+from app import instrumentation
+from app.snapshot import SnapshotStore
 
-from app.transaction import Transaction
-from app.transaction_provider import TransactionProvider
-from app.transfer import TransferProvider
 
-
-def help():
-    print(
-        """tax_stocks: computes the profits (and losses) for stocks transactions and dividends for particular fiscal year.
-Example: python main.py 2021"""
-    )
+def parse_years(value: str) -> Tuple[int, int]:
+    """Parses a single year (e.g. '2021') or a range of years (e.g. '2020-2023')."""
+    first, _, last = value.partition("-")
+    first_year, last_year = int(first), int(last or first)
+    if last_year < first_year:
+        raise ValueError(f"invalid range of years {value}")
+    return first_year, last_year
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description="tax_stocks: computes the profits (and losses) for stocks transactions and dividends "
+        "for particular fiscal year.",
+        epilog="Example: python main.py 2021",
+    )
+    parser.add_argument("years", type=parse_years, help="fiscal year (e.g. 2021) or a range of years (e.g. 2020-2023)")
+    parser.add_argument(
+        "--snapshots",
+        action="store_true",
+        help="resume from the snapshot of the account at the end of an earlier year (stored in data/investing/.cache)",
+    )
+    parser.add_argument(
+        "--stats",
+        nargs="?",
+        const="text",
+        choices=["text", "json"],
+        help="print the time spent in every stage together with lookup and cache counters (to stderr)",
+    )
+    parser.add_argument("--profile", metavar="FILE", help="save cProfile statistics of the run (see pstats)")
+    args = parser.parse_args()
+    first_year, last_year = args.years
+
+    stats = instrumentation.enable() if args.stats else None
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
     try:
-        year = int(sys.argv[1])
-    except (IndexError, ValueError):
-        help()
-        return
-
-    revolut = app.Revolut()
-
-    # === Stocks ===
-
-    transaction_providers: list[TransactionProvider] = [
-        app.Degiro(),
-        revolut,
-    ]
-
-    transactions: list[Transaction] = []
-    for transaction_provider in transaction_providers:
-        transactions += transaction_provider.provide_transactions()
-
-    exchange = app.ExchangeNBP()
-
-    account = app.Account(exchange)
-    account.do_transactions(transactions, year=year)
-
-    account.print_stocks(show_summary_per_stock=True, year=year)
-    account.print_dividends(year=year)
-
-    # # Debug current positions (validate with your portfolio):
-    # account.print_current_positions()
-
-    # Print out all taxable transactions (sells) with buy information.
-    # This should contain everything you need to evaluate the tax.
-    # account.print_stocks_transactions()
-
-    # === Crypto ===
-
-    transfer_providers: list[TransferProvider] = [
-        revolut,
-        app.Binance(),
-    ]
-    transfers = []
-    for transfer_provider in transfer_providers:  # type: ignore[assignment]
-        transfers += transfer_provider.provide_transfers()
-
-    crypto = app.Crypto(transfers, exchange)
-    crypto.print_summary(year=year)
+        exchange = app.ExchangeNBP()
+        if stats is not None:
+            exchange = instrumentation.InstrumentedExchange(exchange, stats)
+        revolut = app.Revolut()
+        app.report_years(
+            first_year,
+            last_year,
+            exchange,
+            transaction_providers=[app.Degiro(), revolut],
+            transfer_providers=[revolut, app.Binance()],
+            snapshots=SnapshotStore("data/investing/.cache") if args.snapshots else None,
+        )
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+    if stats is not None:
+        stats.count_caches()
+        print(stats.to_json() if args.stats == "json" else stats.to_text(), file=sys.stderr)
 
 
 if __name__ == "__main__":
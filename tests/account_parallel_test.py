@@ -0,0 +1,86 @@
+import copy
+import pickle
+import unittest
+
+from datetime import datetime
+from decimal import Decimal
+
+from app.account import Account
+from app.exchange import Currency
+from app.transaction import Transaction, Activity
+
+from tests.exchange_mock import ExchangeMock
+
+
+def transaction(day: int, activity: Activity, quantity: str, price: str, symbol: str) -> Transaction:
+    return Transaction(
+        trade_date=datetime(2021, 1, day),
+        settle_date=datetime(2021, 1, day),
+        currency=Currency.USD,
+        activity=activity,
+        symbol=symbol,
+        quantity=Decimal(quantity),
+        price=Decimal(price),
+        amount=Decimal(quantity) * Decimal(price),
+        dividend_tax_deducted=Decimal(0),
+    )
+
+
+class TestAccountParallel(unittest.TestCase):
+    def setUp(self):
+        self.exchange = ExchangeMock()
+        self.exchange.set_ratio(Currency.USD, Currency.PLN, Decimal("3.9"))
+        self.transactions = [
+            transaction(1, Activity.BUY, "3", "100", "A"),
+            transaction(2, Activity.BUY, "2", "10", "B"),
+            transaction(3, Activity.BUY, "1.5", "50", "C"),
+            transaction(4, Activity.SELL, "2", "120", "A"),
+            transaction(5, Activity.SSP, "2", "0", "B"),
+            transaction(6, Activity.DIV, "0", "0", "C"),
+            transaction(7, Activity.SELL, "3", "6", "B"),
+            transaction(8, Activity.SELL, "1", "90", "A"),
+            transaction(9, Activity.SELL, "0.5", "55", "C"),
+        ]
+        self.transactions[5].amount = Decimal("1.2")
+
+    def test_same_as_sequential(self):
+        expected = Account(self.exchange)
+        expected.do_sorted_transactions(self.transactions, year=2021)
+        account = Account(self.exchange)
+        account.do_transactions_parallel(self.transactions, year=2021, processes=2)
+
+        self.assertEqual(list(account._positions), list(expected._positions))
+        for symbol in ["A", "B", "C"]:
+            self.assertEqual(account.position(symbol).realized_changes, expected.position(symbol).realized_changes)
+            self.assertEqual(
+                list(account.position(symbol)._current_positions.adjusted()),
+                list(expected.position(symbol)._current_positions.adjusted()),
+            )
+            self.assertIs(account.position(symbol)._exchange, self.exchange)
+        self.assertEqual(account._realized_summary, expected._realized_summary)
+        self.assertEqual(list(account._realized_summary), list(expected._realized_summary))
+        self.assertEqual(account.dividends(2021), expected.dividends(2021))
+
+    def test_continues_open_positions(self):
+        expected = Account(self.exchange)
+        expected.do_sorted_transactions(self.transactions, year=2021)
+        account = Account(self.exchange)
+        account.do_sorted_transactions(self.transactions[:4], year=2021)
+        account.do_transactions_parallel(self.transactions[4:], year=2021, processes=2)
+
+        self.assertEqual(account.get_profit(2021), expected.get_profit(2021))
+        self.assertEqual(account.position("A").realized_changes, expected.position("A").realized_changes)
+
+    def test_position_copies_keep_exchange(self):
+        account = Account(self.exchange)
+        account.do_sorted_transactions(self.transactions[:1], year=2021)
+
+        for position in [copy.deepcopy(account.position("A")), pickle.loads(pickle.dumps(account.position("A")))]:
+            changes = position.sell(Decimal(3), Decimal(12), datetime(2021, 1, 10))
+
+            self.assertEqual(len(changes), 1)
+            self.assertEqual(position._current_positions.quantity, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
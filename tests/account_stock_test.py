@@ -303,6 +303,166 @@ class TestAccount(unittest.TestCase):
         self.assertEqual(account.get_profit(year=2021), 100)
         self.assertEqual(account.get_tax(year=2021), 19)
 
+    def test_current_quantity(self):
+        exchange = ExchangeMock()
+        account = Account(exchange)
+
+        # Buy 1 TSLA for 100 PLN, three times.
+        for day in range(1, 4):
+            account.do_transaction(
+                Transaction(
+                    trade_date=datetime(2021, 1, day),
+                    settle_date=datetime(2021, 1, day),
+                    currency=Currency.PLN,
+                    activity=Activity.BUY,
+                    symbol="TSLA",
+                    quantity=Decimal(1),
+                    price=Decimal(100),
+                    amount=Decimal(100),
+                    dividend_tax_deducted=Decimal(0),
+                )
+            )
+        # Sell 1.5 TSLA for 300 PLN.
+        account.do_transaction(
+            Transaction(
+                trade_date=datetime(2021, 1, 4),
+                settle_date=datetime(2021, 1, 4),
+                currency=Currency.PLN,
+                activity=Activity.SELL,
+                symbol="TSLA",
+                quantity=Decimal(1.5),
+                price=Decimal(200),
+                amount=Decimal(300),
+                dividend_tax_deducted=Decimal(0),
+            )
+        )
+
+        # The first lot is sold entirely, half of the second one remains.
+        lots = account.position("TSLA")._current_positions
+        self.assertEqual(len(lots), 2)
+        self.assertEqual(lots.quantity, Decimal(1.5))
+        self.assertEqual(lots.first().quantity, Decimal(0.5))
+        self.assertEqual(account.get_profit(year=2021), 150)
+
+    def test_stock_split_lazy(self):
+        exchange = ExchangeMock()
+        account = Account(exchange)
+
+        def transaction(day: int, activity: Activity, quantity: int, price: int) -> Transaction:
+            return Transaction(
+                trade_date=datetime(2021, 1, day),
+                settle_date=datetime(2021, 1, day),
+                currency=Currency.PLN,
+                activity=activity,
+                symbol="TSLA",
+                quantity=Decimal(quantity),
+                price=Decimal(price),
+                amount=Decimal(quantity * price),
+                dividend_tax_deducted=Decimal(0),
+            )
+
+        # Buy 2 TSLA for 100 PLN each, split with ratio 2 (2 + 2), buy 1 TSLA for 60 PLN.
+        account.do_transaction(transaction(1, Activity.BUY, 2, 100))
+        account.do_transaction(transaction(2, Activity.SSP, 2, 0))
+        account.do_transaction(transaction(3, Activity.BUY, 1, 60))
+        # Sell 3 TSLA for 70 PLN each: (70 - 50) * 3 = 60 PLN profit.
+        account.do_transaction(transaction(4, Activity.SELL, 3, 70))
+        self.assertEqual(account.get_profit(year=2021), 60)
+
+        # Split with ratio 5 (2 + 8): 5 TSLA for 10 PLN and 5 TSLA for 12 PLN remain.
+        account.do_transaction(transaction(5, Activity.SSP, 8, 0))
+        lots = account.position("TSLA")._current_positions
+        self.assertEqual(lots.quantity, 10)
+        self.assertEqual([(lot.quantity, lot.price) for lot in lots.adjusted()], [(5, 10), (5, 12)])
+        # Original data of the lots is left intact.
+        first = lots.first()
+        self.assertEqual((first.quantity_total, first.price), (2, 100))
+
+        # Sell 10 TSLA for 20 PLN each: (20 - 10) * 5 + (20 - 12) * 5 = 90 PLN profit.
+        account.do_transaction(transaction(6, Activity.SELL, 10, 20))
+        self.assertEqual(account.get_profit(year=2021), 150)
+        self.assertEqual(len(lots), 0)
+
+    def test_summary_per_year(self):
+        exchange = ExchangeMock()
+        exchange.set_ratio(Currency.USD, Currency.PLN, Decimal(4))
+        account = Account(exchange)
+
+        def transaction(date: datetime, activity: Activity, quantity: int, price: int) -> Transaction:
+            return Transaction(
+                trade_date=date,
+                settle_date=date,
+                currency=Currency.USD,
+                activity=activity,
+                symbol="AAPL",
+                quantity=Decimal(quantity),
+                price=Decimal(price),
+                amount=Decimal(quantity * price),
+                dividend_tax_deducted=Decimal(0),
+            )
+
+        # Buy 2 AAPL for 10 USD, sell 1 AAPL in 2021 for 15 USD and 1 AAPL in 2022 for 5 USD.
+        account.do_transaction(transaction(datetime(2021, 1, 1), Activity.BUY, 2, 10))
+        account.do_transaction(transaction(datetime(2021, 6, 1), Activity.SELL, 1, 15))
+        account.do_transaction(transaction(datetime(2022, 6, 1), Activity.SELL, 1, 5))
+        # Dividend of 10 USD with 1.5 USD tax deducted (15%), 4% of the tax is left to pay.
+        dividend = transaction(datetime(2022, 7, 1), Activity.DIV, 0, 0)
+        dividend.amount, dividend.dividend_tax_deducted = Decimal(10), Decimal("1.5")
+        account.do_transaction(dividend)
+
+        self.assertEqual(account.get_profit(year=2021), 20)
+        self.assertEqual(account.get_profit(year=2022), -20)
+        self.assertEqual(account.get_profit(), 0)
+        self.assertEqual(account.get_profit_per_symbol(year=2022), {"AAPL": -20})
+        self.assertEqual(account.get_profits(year=2021), (40, 60))
+        self.assertEqual(account.get_profits(), (80, 80))
+
+        total, tax_to_pay, _ = account.dividends(year=2022)
+        self.assertEqual(total, 40)
+        self.assertEqual(round(tax_to_pay, 2), Decimal("1.60"))
+        self.assertEqual(account.dividends(year=2021), (0, 0, 0))
+
+    def test_years_single_pass(self):
+        exchange = ExchangeMock()
+        exchange.set_ratio(Currency.USD, Currency.PLN, Decimal(4))
+
+        def transaction(trade_date: datetime, settle_date: datetime, activity: Activity, quantity: int, price: int):
+            return Transaction(
+                trade_date=trade_date,
+                settle_date=settle_date,
+                currency=Currency.USD,
+                activity=activity,
+                symbol="AAPL",
+                quantity=Decimal(quantity),
+                price=Decimal(price),
+                amount=Decimal(quantity * price),
+                dividend_tax_deducted=Decimal(0),
+            )
+
+        transactions = [
+            transaction(datetime(2020, 3, 1), datetime(2020, 3, 3), Activity.BUY, 4, 10),
+            transaction(datetime(2020, 6, 1), datetime(2020, 6, 3), Activity.SELL, 1, 12),
+            # Sold at the end of 2021, settled in 2022.
+            transaction(datetime(2021, 12, 31), datetime(2022, 1, 3), Activity.SELL, 1, 15),
+            # Dividend booked in 2023, with the (earlier) payment date as the settle date.
+            transaction(datetime(2023, 1, 2), datetime(2022, 12, 30), Activity.DIV, 0, 0),
+            transaction(datetime(2023, 5, 1), datetime(2023, 5, 3), Activity.SELL, 2, 8),
+        ]
+        transactions[3].amount = Decimal(10)
+
+        account = Account(exchange)
+        for year in account.do_sorted_transactions_by_year(transactions, 2019, 2024):
+            expected = Account(exchange)
+            expected.do_sorted_transactions(transactions, year=year)
+            self.assertEqual(account.get_profit(year), expected.get_profit(year))
+            self.assertEqual(account.get_profits(year), expected.get_profits(year))
+            self.assertEqual(account.dividends(year), expected.dividends(year))
+            if year >= 2020:
+                lots = account.position("AAPL")._current_positions
+                self.assertEqual(lots.quantity, expected.position("AAPL")._current_positions.quantity)
+
+        self.assertEqual(account.get_profit(2022), 20)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from app.exchanges.nbp import NBP
+
+import batch
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        nbp = os.path.join(self.folder.name, "nbp")
+        os.makedirs(nbp)
+        with open(os.path.join(nbp, "2021.csv"), "w") as f:
+            f.write("data;1USD;nr tabeli;pelny numer tabeli;\n")
+            f.write("20210104;4,0000;1;001/A/NBP/2021;\n")
+            f.write("20210105;5,0000;2;002/A/NBP/2021;\n")
+        self.exchange = NBP(nbp, cache=False)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def account(self, name: str, sell_price: int) -> str:
+        revolut = os.path.join(self.folder.name, name, "revolut")
+        os.makedirs(revolut)
+        with open(os.path.join(revolut, "2021.csv"), "w") as f:
+            f.write("Date,Ticker,Type,Quantity,Price per share,Total Amount,Currency,FX Rate\n")
+            f.write("05/01/2021 14:00:00,PLTR,BUY,10,20,200,USD,4\n")
+            f.write(f"06/01/2021 14:00:00,PLTR,SELL,10,{sell_price},{10 * sell_price},USD,5\n")
+        return os.path.join(self.folder.name, name)
+
+    def test_read_manifest(self):
+        manifest = os.path.join(self.folder.name, "manifest.txt")
+        with open(manifest, "w") as f:
+            f.write("# accounts\nfirst\n\n  second  \n/accounts/third\n")
+
+        # Relative paths are resolved against the directory of the manifest, not the working directory.
+        folder = os.path.realpath(self.folder.name)
+        expected = [os.path.join(folder, "first"), os.path.join(folder, "second"), "/accounts/third"]
+        self.assertEqual(batch.read_manifest(os.path.realpath(manifest)), expected)
+
+    def test_run(self):
+        # Bought for 20 USD * 4 PLN, sold for 30 (or 10) USD * 5 PLN.
+        folders = [self.account("first", 30), self.account("second", 10), os.path.join(self.folder.name, "missing")]
+
+        results = batch.run(folders, 2021, self.exchange, processes=2)
+
+        self.assertEqual([error is None for _, error in results], [True, True, False])
+        with open(results[0][0]) as f:
+            self.assertIn("Profit = 700.0000 PLN", f.read())
+        with open(os.path.join(folders[1], "report_2021.txt")) as f:
+            self.assertIn("Profit = -300.0000 PLN", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+from datetime import datetime
+from decimal import Decimal
+
+from app.account import Account
+from app.exchange import Currency, Exchange
+from app.exchanges import Cached
+from app.transaction import Transaction, Activity
+
+
+class CountingExchange(Exchange):
+    def __init__(self):
+        self.lookups = 0
+
+    def ratio(self, day: datetime, c_from: Currency, c_to: Currency, max_days_prior_to_check: int = 5) -> Decimal:
+        self.lookups += 1
+        if day.year < 2000:
+            raise KeyError(day)
+        return Decimal(day.day)
+
+
+class TestCachedExchange(unittest.TestCase):
+    def test_hits(self):
+        exchange = CountingExchange()
+        cached = Cached(exchange)
+
+        self.assertEqual(cached.ratio(datetime(2021, 1, 4), Currency.USD, Currency.PLN), Decimal(4))
+        # Time of the day does not matter.
+        self.assertEqual(cached.ratio(datetime(2021, 1, 4, 15, 30), Currency.USD, Currency.PLN), Decimal(4))
+        self.assertEqual(cached.ratio(datetime(2021, 1, 4), Currency.EUR, Currency.PLN), Decimal(4))
+
+        self.assertEqual(exchange.lookups, 2)
+        self.assertEqual((cached.hits, cached.misses), (1, 2))
+        self.assertAlmostEqual(cached.hit_rate, 1 / 3)
+
+    def test_eviction(self):
+        exchange = CountingExchange()
+        cached = Cached(exchange, maxsize=2)
+
+        cached.ratio(datetime(2021, 1, 1), Currency.USD, Currency.PLN)
+        cached.ratio(datetime(2021, 1, 2), Currency.USD, Currency.PLN)
+        cached.ratio(datetime(2021, 1, 1), Currency.USD, Currency.PLN)  # most recently used now
+        cached.ratio(datetime(2021, 1, 3), Currency.USD, Currency.PLN)  # evicts 2021-01-02
+        cached.ratio(datetime(2021, 1, 1), Currency.USD, Currency.PLN)
+        cached.ratio(datetime(2021, 1, 2), Currency.USD, Currency.PLN)
+
+        self.assertEqual(len(cached), 2)
+        self.assertEqual(exchange.lookups, 4)
+
+    def test_errors_not_cached(self):
+        exchange = CountingExchange()
+        cached = Cached(exchange)
+
+        for _ in range(2):
+            with self.assertRaises(KeyError):
+                cached.ratio(datetime(1999, 1, 1), Currency.USD, Currency.PLN)
+
+        self.assertEqual(exchange.lookups, 2)
+        self.assertEqual(len(cached), 0)
+
+    def test_account(self):
+        exchange = CountingExchange()
+        account = Account(Cached(exchange))
+        for activity, day in [(Activity.BUY, 4), (Activity.BUY, 4), (Activity.SELL, 5)]:
+            account.do_transaction(
+                Transaction(
+                    trade_date=datetime(2021, 1, day),
+                    settle_date=datetime(2021, 1, day),
+                    currency=Currency.USD,
+                    activity=activity,
+                    symbol="TSLA",
+                    quantity=Decimal(1 if activity == Activity.BUY else 2),
+                    price=Decimal(100),
+                    amount=Decimal(100),
+                    dividend_tax_deducted=Decimal(0),
+                )
+            )
+
+        # 2 * 100 USD sold at 5 PLN, bought at 4 PLN.
+        self.assertEqual(account.get_profit(2021), Decimal(200))
+        self.assertEqual(exchange.lookups, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from datetime import datetime
+
+from app.dates import parse_date, parse_date_time
+
+
+class TestDates(unittest.TestCase):
+    def test_parse_date(self):
+        self.assertEqual(parse_date("04-01-2021", "%d-%m-%Y"), datetime(2021, 1, 4))
+        self.assertEqual(parse_date("04/01/2021", "%d/%m/%Y"), datetime(2021, 1, 4))
+        self.assertEqual(parse_date("2021-01-04", "%Y-%m-%d"), datetime(2021, 1, 4))
+        self.assertEqual(parse_date("20210104", "%Y%m%d"), datetime(2021, 1, 4))
+        # Other layouts fall back to strptime.
+        self.assertEqual(parse_date("4-1-2021", "%d-%m-%Y"), datetime(2021, 1, 4))
+        self.assertEqual(parse_date("2021.01.04", "%Y.%m.%d"), datetime(2021, 1, 4))
+
+    def test_parse_date_invalid(self):
+        for value, fmt in [("04/01/2021", "%d-%m-%Y"), ("2021-13-04", "%Y-%m-%d"), ("0a-01-2021", "%d-%m-%Y")]:
+            with self.assertRaises(ValueError):
+                parse_date(value, fmt)
+
+    def test_parse_date_time(self):
+        self.assertEqual(parse_date_time("04-01-2021", "15:30", "%d-%m-%Y"), datetime(2021, 1, 4, 15, 30))
+
+
+if __name__ == "__main__":
+    unittest.main()
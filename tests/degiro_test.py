@@ -0,0 +1,60 @@
+import csv
+import io
+import os
+import tempfile
+import unittest
+
+from contextlib import redirect_stdout
+from decimal import Decimal
+from typing import List
+
+from app.providers.degiro import Degiro
+from app.transaction import Activity
+
+HEADER = ["Data", "Czas", "Data", "Produkt", "ISIN", "Opis", "Kurs", "Zmiana", "", "Saldo", "", "Id"]
+
+
+def row(date: str, description: str, amount: str, product: str = "TESLA INC") -> List[str]:
+    return [date, "10:00", date, product, "", description, "", "USD", amount, "", "", ""]
+
+
+class TestDegiro(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def write(self, name: str, rows: List[List[str]]):
+        with open(os.path.join(self.folder.name, name), "w", newline="") as f:
+            writer = csv.writer(f, delimiter=",")
+            writer.writerow(HEADER)
+            writer.writerows(rows)
+
+    def test_dividend_tax_in_next_statement(self):
+        self.write(
+            "2020.csv", [row("30-12-2020", "Kupno 2 TESLA INC@100 USD", "-200"), row("31-12-2020", "Dywidenda", "10")]
+        )
+        self.write("2021.csv", [row("04-01-2021", "Podatek Dywidendowy", "-1,5")])
+
+        for processes in [1, 2]:
+            transactions = Degiro(self.folder.name, processes=processes, cache=False).provide_transactions()
+
+            dividends = [t for t in transactions if t.activity is Activity.DIV]
+            self.assertEqual(len(transactions), 2)
+            self.assertEqual(dividends[0].amount, Decimal(10))
+            self.assertEqual(dividends[0].dividend_tax_deducted, Decimal("1.5"))
+
+    def test_dividend_tax_without_dividend(self):
+        self.write("2021.csv", [row("04-01-2021", "Podatek Dywidendowy", "-1,5")])
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            transactions = Degiro(self.folder.name, cache=False).provide_transactions()
+
+        self.assertEqual(transactions, [])
+        self.assertIn("Dividend tax without a dividend", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+import unittest
+
+from datetime import datetime
+from decimal import Decimal
+
+from app import instrumentation
+from app.exchange import Currency
+from app.providers.cache import StatementCache
+from app.providers.files import list_files, parse_files
+
+from tests.exchange_mock import ExchangeMock
+
+
+def parse(file_name: str):
+    with open(file_name, "r") as f:
+        return f.read().split()
+
+
+class TestInstrumentation(unittest.TestCase):
+    def tearDown(self):
+        instrumentation.disable()
+
+    def test_disabled(self):
+        items = [1, 2, 3]
+
+        self.assertIs(instrumentation.timed("stage", items), items)
+        self.assertIs(instrumentation.counted("counter", items), items)
+        with instrumentation.stage("stage") as stage:
+            stage.items += 1
+        self.assertIsNone(instrumentation.active())
+
+    def test_stages_and_counters(self):
+        stats = instrumentation.enable()
+
+        with instrumentation.stage("stage") as stage:
+            stage.items += 2
+        with instrumentation.stage("stage") as stage:
+            stage.items += 1
+        self.assertEqual(list(instrumentation.timed("years", iter([2020, 2021]))), [2020, 2021])
+        self.assertEqual(list(instrumentation.counted("transactions", "abc")), ["a", "b", "c"])
+        instrumentation.count("lookups", 5)
+
+        self.assertEqual(stats.stages["stage"].items, 3)
+        self.assertEqual(stats.stages["years"].items, 2)
+        self.assertEqual(stats.counters, {"transactions": 3, "lookups": 5})
+        self.assertEqual(json.loads(stats.to_json())["stages"]["stage"]["items"], 3)
+        self.assertIn("transactions", stats.to_text())
+
+    def test_exchange_lookups(self):
+        stats = instrumentation.enable()
+        mock = ExchangeMock()
+        mock.set_ratio(Currency.USD, Currency.PLN, Decimal(4))
+        exchange = instrumentation.InstrumentedExchange(mock, stats)
+
+        self.assertEqual(exchange.ratio(datetime(2021, 1, 4), Currency.USD, Currency.PLN), Decimal(4))
+        self.assertEqual(exchange.ratio(datetime(2021, 1, 5), Currency.USD, Currency.PLN), Decimal(4))
+
+        self.assertEqual(stats.stages["fx lookups"].items, 2)
+
+    def test_statement_cache_counters(self):
+        stats = instrumentation.enable()
+        with tempfile.TemporaryDirectory() as folder:
+            for name, content in [("2020.csv", "a b"), ("2021.csv", "c")]:
+                with open(os.path.join(folder, name), "w") as f:
+                    f.write(content)
+            cache = StatementCache(os.path.join(folder, ".cache"))
+            files = list_files(folder)
+
+            parse_files(parse, files, cache=cache, parser="mock:1")
+            parse_files(parse, files, cache=cache, parser="mock:1")
+
+        self.assertEqual(stats.counters, {"statement_cache.hits": 2, "statement_cache.misses": 2})
+        self.assertEqual(stats.stages["parse mock"].items, 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
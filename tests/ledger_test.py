@@ -0,0 +1,102 @@
+import unittest
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from app.account import Account
+from app.exchange import Currency
+from app.ledger import Ledger
+from app.transaction import Transaction, Activity
+
+from tests.exchange_mock import ExchangeMock
+
+
+def transaction(
+    trade_date: datetime, activity: Activity, quantity: str, price: str, symbol: str = "AAPL"
+) -> Transaction:
+    return Transaction(
+        trade_date=trade_date,
+        settle_date=datetime(trade_date.year, trade_date.month, trade_date.day),
+        currency=Currency.USD,
+        activity=activity,
+        symbol=symbol,
+        quantity=Decimal(quantity),
+        price=Decimal(price),
+        amount=Decimal(quantity) * Decimal(price),
+        dividend_tax_deducted=Decimal(0),
+    )
+
+
+class TestLedger(unittest.TestCase):
+    def test_round_trip(self):
+        transactions = [
+            transaction(datetime(2021, 1, 4, 15, 30), Activity.BUY, "0.12345678", "130.25"),
+            transaction(datetime(2021, 1, 5, 9, 1, 7), Activity.SELL, "10", "420.69", symbol="TSLA"),
+            transaction(datetime(2021, 1, 6), Activity.BUY, "3", "0.0001", symbol="AAPL"),
+        ]
+
+        ledger = Ledger.from_transactions(transactions)
+
+        self.assertEqual(len(ledger), 3)
+        self.assertEqual(ledger.symbols, ["AAPL", "TSLA"])
+        self.assertEqual(list(ledger), transactions)
+
+    def test_lossless(self):
+        transactions = [
+            transaction(datetime(2021, 1, 4, 1, 2, 3, 4), Activity.BUY, "0.123456789012345", "0.000000001"),
+            transaction(datetime(2021, 1, 5), Activity.BUY, "12345678901234567890.5", "1.50"),
+            transaction(datetime(2021, 1, 3), Activity.SELL, "-0", "1E+3"),
+        ]
+
+        ledger = Ledger.from_transactions(transactions)
+        ledger.sort()
+
+        expected = [transactions[2], transactions[0], transactions[1]]
+        self.assertEqual(list(ledger), expected)
+        # Exponents are kept as well, not only the values.
+        self.assertEqual([str(t.price) for t in ledger], ["1E+3", "1E-9", "1.50"])
+        self.assertEqual([str(t.quantity) for t in ledger], ["-0", "0.123456789012345", "12345678901234567890.5"])
+        self.assertEqual([str(t.amount) for t in ledger], [str(t.amount) for t in expected])
+
+    def test_time_zone(self):
+        ledger = Ledger()
+
+        with self.assertRaises(ValueError):
+            ledger.append(transaction(datetime(2021, 1, 4, tzinfo=timezone.utc), Activity.BUY, "1", "1"))
+        # A rejected transaction does not leave a partial row behind.
+        self.assertEqual(len(ledger), 0)
+
+    def test_sort(self):
+        ledger = Ledger.from_transactions(
+            [
+                transaction(datetime(2021, 1, 5), Activity.SELL, "1", "2", symbol="B"),
+                transaction(datetime(2021, 1, 4), Activity.BUY, "1", "1", symbol="A"),
+                transaction(datetime(2021, 1, 5), Activity.BUY, "1", "3", symbol="C"),
+            ]
+        )
+
+        ledger.sort()
+
+        self.assertEqual([t.symbol for t in ledger], ["A", "B", "C"])
+
+    def test_account_do_ledger(self):
+        transactions = [
+            transaction(datetime(2022, 2, 1), Activity.SELL, "5", "150"),
+            transaction(datetime(2021, 1, 4), Activity.BUY, "10", "100"),
+            transaction(datetime(2021, 6, 1), Activity.SELL, "2", "120"),
+        ]
+        exchange = ExchangeMock()
+        exchange.set_ratio(Currency.USD, Currency.PLN, Decimal(4))
+
+        expected = Account(exchange)
+        expected.do_transactions(list(transactions), year=2022)
+        account = Account(exchange)
+        account.do_ledger(Ledger.from_transactions(transactions), year=2022)
+
+        self.assertEqual(account.get_profit(2021), expected.get_profit(2021))
+        self.assertEqual(account.get_profit(2022), expected.get_profit(2022))
+        self.assertEqual(account.get_profit(2022), Decimal(1000))
+
+
+if __name__ == "__main__":
+    unittest.main()
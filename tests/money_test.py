@@ -0,0 +1,78 @@
+import io
+import random
+import unittest
+
+from contextlib import redirect_stdout
+from datetime import datetime
+from decimal import Decimal
+
+from app.account import Account
+from app.dividend import Dividend
+from app.exchange import Currency
+from app.money import TAX_RATE
+from app.transaction import Transaction, Activity
+
+from tests.exchange_mock import ExchangeMock
+
+
+def random_decimal(rng: random.Random, max_places: int = 8) -> Decimal:
+    """Amount such as in the statements: up to 8 integer digits and up to max_places decimal places."""
+    places = rng.randint(0, max_places)
+    return Decimal(rng.randint(0, 10 ** (8 + places))).scaleb(-places)
+
+
+def transaction(day: int, activity: Activity, price: Decimal, amount: Decimal = Decimal(0)) -> Transaction:
+    return Transaction(
+        trade_date=datetime(2021, 1, day),
+        settle_date=datetime(2021, 1, day),
+        currency=Currency.PLN,
+        activity=activity,
+        symbol="TSLA",
+        quantity=Decimal(1),
+        price=price,
+        amount=amount,
+        dividend_tax_deducted=Decimal(0),
+    )
+
+
+class TestTaxRate(unittest.TestCase):
+    """Randomized (but seeded, so reproducible) checks that the results did not change with the shared tax rate."""
+
+    def setUp(self):
+        self.rng = random.Random(19)
+
+    def test_tax_rate(self):
+        self.assertEqual(str(TAX_RATE), str(Decimal(0.19)))
+
+    def test_dividend_tax_to_pay(self):
+        for _ in range(1000):
+            value, deducted = random_decimal(self.rng), random_decimal(self.rng, max_places=2)
+            dividend = Dividend(value, deducted, datetime(2021, 1, 1), Currency.PLN)
+
+            payable = value * Decimal(0.19) - deducted
+            self.assertEqual(str(dividend.tax_to_pay()), str(payable if payable > 0 else Decimal(0)))
+
+    def test_account_tax(self):
+        for _ in range(100):
+            buy, sell = random_decimal(self.rng), random_decimal(self.rng)
+            account = Account(ExchangeMock())
+            account.do_transaction(transaction(1, Activity.BUY, buy))
+            account.do_transaction(transaction(2, Activity.SELL, sell))
+
+            tax = round((sell - buy) * Decimal(0.19), 2)
+            self.assertEqual(str(account.get_tax(2021)), str(tax if tax >= 0 else Decimal(0)))
+
+    def test_printed_dividend_tax(self):
+        account = Account(ExchangeMock())
+        account.do_transaction(transaction(1, Activity.DIV, Decimal(0), amount=Decimal("1718.9905")))
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            account.print_dividends(2021)
+
+        self.assertIn(f"Tax        = {round(Decimal('1718.9905') * Decimal(0.19), 4)} PLN", output.getvalue())
+        self.assertIn("Tax        = 326.6082 PLN", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
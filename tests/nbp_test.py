@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+
+from datetime import datetime
+from decimal import Decimal
+
+from app.exchange import Currency
+from app.exchanges.nbp import NBP
+
+
+class TestNBP(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.folder.name, "2021.csv"), "w") as f:
+            f.write("data;1USD;1EUR;100JPY;1RUB;nr tabeli;pelny numer tabeli;\n")
+            f.write("20210104;3,6998;4,5485;3,5925;0,0498;1;001/A/NBP/2021;\n")  # Monday
+            f.write("20210105;3,7031;4,5580;3,5941;;2;002/A/NBP/2021;\n")
+            f.write("20210108;3,7000;4,5268;3,5654;;5;005/A/NBP/2021;\n")  # Friday
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_ratio_previous_day(self):
+        exchange = NBP(self.folder.name)
+
+        self.assertEqual(exchange.ratio(datetime(2021, 1, 5), Currency.USD, Currency.PLN), Decimal("3.6998"))
+        self.assertEqual(exchange.ratio(datetime(2021, 1, 6, 15, 30), Currency.EUR, Currency.PLN), Decimal("4.5580"))
+
+    def test_ratio_skips_days_without_table(self):
+        exchange = NBP(self.folder.name)
+
+        # Saturday, Sunday and Monday use the rate published on Friday.
+        self.assertEqual(exchange.ratio(datetime(2021, 1, 9), Currency.USD, Currency.PLN), Decimal("3.7000"))
+        self.assertEqual(exchange.ratio(datetime(2021, 1, 11), Currency.USD, Currency.PLN), Decimal("3.7000"))
+        # Thursday uses the rate published on Tuesday.
+        self.assertEqual(exchange.ratio(datetime(2021, 1, 7), Currency.USD, Currency.PLN), Decimal("3.7031"))
+
+    def test_ratio_max_days_prior_to_check(self):
+        exchange = NBP(self.folder.name)
+
+        with self.assertRaises(KeyError):
+            exchange.ratio(datetime(2021, 1, 7), Currency.USD, Currency.PLN, max_days_prior_to_check=0)
+        with self.assertRaises(KeyError):
+            exchange.ratio(datetime(2021, 1, 20), Currency.USD, Currency.PLN)
+        with self.assertRaises(KeyError):
+            exchange.ratio(datetime(2021, 1, 4), Currency.USD, Currency.PLN)
+
+    def test_ratio_per_unit(self):
+        exchange = NBP(self.folder.name)
+
+        # The table contains the rate of 100 JPY.
+        self.assertEqual(exchange.ratio(datetime(2021, 1, 5), Currency.JPY, Currency.PLN), Decimal("0.035925"))
+
+    def test_ratio_currency_not_published(self):
+        exchange = NBP(self.folder.name)
+
+        # RUB was quoted only on Monday, rates are not looked up further than 6 days back.
+        self.assertEqual(exchange.ratio(datetime(2021, 1, 9), Currency.RUB, Currency.PLN), Decimal("0.0498"))
+        with self.assertRaises(KeyError):
+            exchange.ratio(datetime(2021, 1, 11), Currency.RUB, Currency.PLN)
+        with self.assertRaises(KeyError):
+            exchange.ratio(datetime(2021, 1, 5), Currency.GBP, Currency.PLN)
+
+    def test_cache_invalidated_on_change(self):
+        exchange = NBP(self.folder.name)
+        self.assertEqual(exchange.ratio(datetime(2021, 1, 5), Currency.USD, Currency.PLN), Decimal("3.6998"))
+        self.assertTrue(os.path.isfile(os.path.join(self.folder.name, ".cache", "nbp.pickle")))
+
+        with open(os.path.join(self.folder.name, "2021.csv"), "a") as f:
+            f.write("20210111;3,7500;4,5500;3,6000;;6;006/A/NBP/2021;\n")
+
+        exchange = NBP(self.folder.name)
+        self.assertEqual(exchange.ratio(datetime(2021, 1, 5), Currency.USD, Currency.PLN), Decimal("3.6998"))
+        self.assertEqual(exchange.ratio(datetime(2021, 1, 12), Currency.USD, Currency.PLN), Decimal("3.7500"))
+
+    def test_old_table(self):
+        with open(os.path.join(self.folder.name, "1999.csv"), "w") as f:
+            # Currencies which are no longer published (DEM), and rates with more than 4 decimal places.
+            f.write("data;1USD;1DEM;nr tabeli;\n")
+            f.write("19991230;4,123456;2,1;1;\n")
+
+        exchange = NBP(self.folder.name, cache=False)
+
+        self.assertEqual(exchange.ratio(datetime(1999, 12, 31), Currency.USD, Currency.PLN), Decimal("4.123456"))
+        self.assertEqual(exchange.ratio(datetime(2021, 1, 5), Currency.USD, Currency.PLN), Decimal("3.6998"))
+
+    def test_ratio_pln(self):
+        exchange = NBP(self.folder.name)
+
+        self.assertEqual(exchange.ratio(datetime(2000, 1, 1), Currency.PLN, Currency.PLN), Decimal(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
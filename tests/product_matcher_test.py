@@ -0,0 +1,31 @@
+import unittest
+
+from app.providers.matcher import ProductMatcher
+
+
+class TestProductMatcher(unittest.TestCase):
+    def test_find(self):
+        matcher = ProductMatcher({"TESLA": "TSLA", "APPLE INC": "AAPL", "AMC": "AMC"})
+
+        self.assertEqual(matcher.find("TESLA INC"), "TSLA")
+        self.assertEqual(matcher.find("APPLE INC - COMMON"), "AAPL")
+        self.assertEqual(matcher.find("APPLE"), None)
+        self.assertEqual(matcher.find(""), None)
+
+    def test_find_first_pattern_wins(self):
+        matcher = ProductMatcher({"CLASS A": "A", "ALPHABET INC": "GOOGL", "INC": "INC"})
+
+        # All three patterns occur, the one given first wins regardless of its position in the text.
+        self.assertEqual(matcher.find("ALPHABET INC. - CLASS A"), "A")
+        self.assertEqual(matcher.find("ALPHABET INC. - CLASS C"), "GOOGL")
+
+    def test_find_overlapping_patterns(self):
+        matcher = ProductMatcher({"ABAB": "1", "BAC": "2"})
+
+        self.assertEqual(matcher.find("ABABAC"), "1")
+        self.assertEqual(matcher.find("ABBAC"), "2")
+        self.assertEqual(matcher.find("ABABA"), "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+from datetime import datetime
+from decimal import Decimal
+
+from app.account import Account
+from app.equity import RealizedChange
+from app.exchange import Currency
+from app.realized import RealizedChanges, month_period, quarter_period
+from app.transaction import Transaction, Activity
+
+from tests.exchange_mock import ExchangeMock
+
+
+def change(date_sell: datetime, profit: int = 1) -> RealizedChange:
+    return RealizedChange(
+        date_buy=datetime(2020, 1, 1),
+        date_sell=date_sell,
+        quantity=Decimal(1),
+        price_buy=Decimal(1),
+        price_sell=Decimal(1 + profit),
+        profit=Decimal(profit),
+        currency=Currency.PLN,
+        ratio_buy=Decimal(1),
+        ratio_sell=Decimal(1),
+        cost=Decimal(1),
+        proceeds=Decimal(1 + profit),
+    )
+
+
+def transaction(trade_date: datetime, activity: Activity, price: int) -> Transaction:
+    return Transaction(
+        trade_date=trade_date,
+        settle_date=trade_date,
+        currency=Currency.PLN,
+        activity=activity,
+        symbol="TSLA",
+        quantity=Decimal(1),
+        price=Decimal(price),
+        amount=Decimal(price),
+        dividend_tax_deducted=Decimal(0),
+    )
+
+
+class TestRealizedChanges(unittest.TestCase):
+    def test_between(self):
+        dates = [datetime(2021, 1, 31), datetime(2021, 2, 1), datetime(2021, 3, 31, 23, 59), datetime(2021, 4, 1)]
+        changes = RealizedChanges(change(d) for d in dates)
+
+        self.assertEqual([c.date_sell for c in changes.between(*month_period(2021, 2))], dates[1:2])
+        self.assertEqual([c.date_sell for c in changes.between(*quarter_period(2021, 1))], dates[:3])
+        self.assertEqual([c.date_sell for c in changes.in_year(2021)], dates)
+        self.assertEqual(changes.in_year(2022), [])
+
+    def test_append_out_of_order(self):
+        changes = RealizedChanges()
+        changes.append(change(datetime(2021, 5, 1), profit=1))
+        changes.append(change(datetime(2021, 3, 1), profit=2))
+        changes.append(change(datetime(2021, 3, 1), profit=3))
+
+        self.assertEqual([c.profit for c in changes], [2, 3, 1])
+        self.assertEqual([c.profit for c in changes.between(*month_period(2021, 3))], [2, 3])
+
+    def test_periods(self):
+        self.assertEqual(month_period(2021, 12), (datetime(2021, 12, 1), datetime(2022, 1, 1)))
+        self.assertEqual(quarter_period(2021, 4), (datetime(2021, 10, 1), datetime(2022, 1, 1)))
+        with self.assertRaises(ValueError):
+            quarter_period(2021, 5)
+
+    def test_account_summary(self):
+        account = Account(ExchangeMock())
+        account.do_transactions(
+            [
+                transaction(datetime(2021, 1, 4), Activity.BUY, 100),
+                transaction(datetime(2021, 1, 4), Activity.BUY, 100),
+                transaction(datetime(2021, 2, 10), Activity.SELL, 150),
+                transaction(datetime(2021, 5, 10), Activity.SELL, 80),
+            ],
+            year=2021,
+        )
+
+        self.assertEqual(account.get_realized_summary(*quarter_period(2021, 1)).profit, 50)
+        self.assertEqual(account.get_realized_summary(*quarter_period(2021, 2)).profit, -20)
+        self.assertEqual(account.get_realized_summary(*month_period(2021, 3), symbol="TSLA").proceeds, 0)
+        self.assertEqual(len(account.realized_changes(datetime(2021, 1, 1), datetime(2022, 1, 1))), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+from unittest import mock
+
+from app.account import Account
+from app.exchange import Currency
+from app.snapshot import SnapshotStore
+from app.transaction import Transaction, Activity
+
+from tests.exchange_mock import ExchangeMock
+
+
+def transaction(date: datetime, activity: Activity, quantity: int, price: int) -> Transaction:
+    return Transaction(
+        trade_date=date,
+        settle_date=date,
+        currency=Currency.USD,
+        activity=activity,
+        symbol="AAPL",
+        quantity=Decimal(quantity),
+        price=Decimal(price),
+        amount=Decimal(quantity * price),
+        dividend_tax_deducted=Decimal(0),
+    )
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.store = SnapshotStore(self.folder.name)
+        self.exchange = ExchangeMock()
+        self.exchange.set_ratio(Currency.USD, Currency.PLN, Decimal(4))
+        self.transactions = [
+            transaction(datetime(2020, 3, 1), Activity.BUY, 4, 10),
+            transaction(datetime(2020, 6, 1), Activity.SELL, 1, 12),
+            transaction(datetime(2021, 2, 1), Activity.BUY, 2, 20),
+            transaction(datetime(2021, 7, 1), Activity.SELL, 2, 15),
+            transaction(datetime(2022, 1, 10), Activity.SELL, 2, 30),
+        ]
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def replay(self, transactions: List[Transaction], first_year: int, last_year: int) -> List[Transaction]:
+        """Returns the transactions processed while replaying, checks the account against a full run."""
+        expected = {}
+        for year in range(first_year, last_year + 1):
+            expected[year] = Account(self.exchange)
+            expected[year].do_sorted_transactions(transactions, year=year)
+
+        processed: List[Transaction] = []
+        do_transaction = Account.do_transaction
+
+        def record(account: Account, t: Transaction):
+            processed.append(t)
+            do_transaction(account, t)
+
+        with mock.patch.object(Account, "do_transaction", record):
+            # The account is checked before the following years are processed.
+            for year, account in self.store.replay(self.exchange, transactions, first_year, last_year):
+                self.assertEqual(account.get_profit(year), expected[year].get_profit(year))
+                self.assertEqual(
+                    list(account.position("AAPL")._current_positions.adjusted()),
+                    list(expected[year].position("AAPL")._current_positions.adjusted()),
+                )
+        return processed
+
+    def test_resume_from_snapshot(self):
+        self.assertEqual(len(self.replay(self.transactions[:4], 2021, 2021)), 4)
+        self.assertEqual(len(os.listdir(self.folder.name)), 1)
+
+        # Only the transactions after the end of 2021 are processed again.
+        self.assertEqual(self.replay(self.transactions, 2022, 2022), self.transactions[4:])
+
+    def test_changed_prefix(self):
+        self.replay(self.transactions, 2020, 2022)
+
+        # A corrected transaction of 2021 invalidates the snapshots taken at the ends of 2021 and 2022.
+        transactions = list(self.transactions)
+        transactions[3] = transaction(datetime(2021, 7, 1), Activity.SELL, 2, 16)
+        self.assertEqual(self.replay(transactions, 2022, 2022), transactions[2:])
+
+    def test_replaced_snapshots_removed(self):
+        self.replay(self.transactions, 2020, 2022)
+        self.assertEqual(len(os.listdir(self.folder.name)), 3)
+
+        transactions = list(self.transactions)
+        transactions[3] = transaction(datetime(2021, 7, 1), Activity.SELL, 2, 16)
+        self.replay(transactions, 2020, 2022)
+
+        # Only the latest snapshot of every year is kept.
+        self.assertEqual(sorted(name[:5] for name in os.listdir(self.folder.name)), ["2020-", "2021-", "2022-"])
+
+    def test_restored_account(self):
+        list(self.store.replay(self.exchange, self.transactions[:3], 2021, 2021))
+
+        _, account = next(self.store.replay(self.exchange, self.transactions[:3], 2021, 2021))
+
+        self.assertIs(account._exchange, self.exchange)
+        self.assertIs(account.position("AAPL")._exchange, self.exchange)
+        self.assertEqual(account.position("AAPL")._current_positions.quantity, 5)
+        self.assertEqual(account.get_profit(2020), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import io
+import os
+import tempfile
+import unittest
+
+from contextlib import redirect_stdout
+from typing import List
+
+from app.providers.cache import StatementCache
+from app.providers.files import list_files, parse_files
+
+
+class ParserMock:
+    def __init__(self):
+        self.parsed: List[str] = []
+
+    def parse(self, file_name: str) -> List[str]:
+        self.parsed.append(os.path.basename(file_name))
+        with open(file_name, "r") as f:
+            records = f.read().split()
+        if "?" in records:
+            print("Unknown record: ?")
+        if "!" in records:
+            print("Invalid record: !")
+            raise ValueError("invalid record")
+        return records
+
+
+class TestStatementCache(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        for name, content in [("2020.csv", "a b"), ("2021.csv", "c")]:
+            with open(os.path.join(self.folder.name, name), "w") as f:
+                f.write(content)
+        self.cache = StatementCache(os.path.join(self.folder.name, ".cache"))
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_parse_files_cached(self):
+        files = list_files(self.folder.name)
+
+        parser = ParserMock()
+        self.assertEqual(parse_files(parser.parse, files, cache=self.cache, parser="mock:1"), [["a", "b"], ["c"]])
+        self.assertEqual(parser.parsed, ["2020.csv", "2021.csv"])
+
+        # The cache directory is not listed as a statement.
+        self.assertEqual(list_files(self.folder.name), files)
+
+        parser = ParserMock()
+        self.assertEqual(parse_files(parser.parse, files, cache=self.cache, parser="mock:1"), [["a", "b"], ["c"]])
+        self.assertEqual(parser.parsed, [])
+
+    def test_parse_files_changed(self):
+        files = list_files(self.folder.name)
+        parse_files(ParserMock().parse, files, cache=self.cache, parser="mock:1")
+
+        with open(files[1], "a") as f:
+            f.write(" d")
+
+        parser = ParserMock()
+        self.assertEqual(parse_files(parser.parse, files, cache=self.cache, parser="mock:1"), [["a", "b"], ["c", "d"]])
+        self.assertEqual(parser.parsed, ["2021.csv"])
+
+        # A new version of the parser parses all statements again.
+        parser = ParserMock()
+        parse_files(parser.parse, files, cache=self.cache, parser="mock:2")
+        self.assertEqual(parser.parsed, ["2020.csv", "2021.csv"])
+
+        # Only the latest entry of every statement is kept.
+        self.assertEqual(len(os.listdir(self.cache.folder)), 2)
+
+    def test_parsers_of_same_files(self):
+        files = list_files(self.folder.name)
+        parse_files(ParserMock().parse, files, cache=self.cache, parser="mock.transactions:1")
+        parse_files(ParserMock().parse, files, cache=self.cache, parser="mock.transfers:1")
+
+        self.assertEqual(len(os.listdir(self.cache.folder)), 4)
+
+    def test_output_replayed(self):
+        with open(os.path.join(self.folder.name, "2022.csv"), "w") as f:
+            f.write("?")
+        files = list_files(self.folder.name)
+
+        for processes in [1, 2]:
+            output = io.StringIO()
+            with redirect_stdout(output):
+                parse_files(ParserMock().parse, files, processes=processes, cache=self.cache, parser="mock:1")
+            self.assertEqual(output.getvalue(), "Unknown record: ?\n")
+
+    def test_output_of_failed_parse(self):
+        with open(os.path.join(self.folder.name, "2022.csv"), "w") as f:
+            f.write("!")
+        files = list_files(self.folder.name)
+
+        output = io.StringIO()
+        with redirect_stdout(output), self.assertRaises(ValueError):
+            parse_files(ParserMock().parse, files, cache=self.cache, parser="mock:1")
+        self.assertEqual(output.getvalue(), "Invalid record: !\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from datetime import datetime
+from decimal import Decimal
+
+from app.exchange import Currency
+from app.transaction import Transaction, Activity
+from app.transaction_provider import TransactionProvider, merge_transactions
+
+
+def transaction(day: int, symbol: str) -> Transaction:
+    return Transaction(
+        trade_date=datetime(2021, 1, day),
+        settle_date=datetime(2021, 1, day),
+        currency=Currency.PLN,
+        activity=Activity.BUY,
+        symbol=symbol,
+        quantity=Decimal(1),
+        price=Decimal(100),
+        amount=Decimal(100),
+        dividend_tax_deducted=Decimal(0),
+    )
+
+
+class ProviderMock(TransactionProvider):
+    def __init__(self, transactions: list[Transaction]):
+        self._transactions = transactions
+
+    def provide_transactions(self) -> list[Transaction]:
+        return list(self._transactions)
+
+
+class TestTransactionProvider(unittest.TestCase):
+    def test_merge_transactions(self):
+        first = ProviderMock([transaction(3, "A"), transaction(1, "A"), transaction(2, "A")])
+        second = ProviderMock([transaction(2, "B"), transaction(4, "B")])
+
+        merged = [(t.trade_date.day, t.symbol) for t in merge_transactions([first, second])]
+
+        # Transactions with the same trade date keep the order of the providers.
+        self.assertEqual(merged, [(1, "A"), (2, "A"), (2, "B"), (3, "A"), (4, "B")])
+
+
+if __name__ == "__main__":
+    unittest.main()